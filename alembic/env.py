@@ -30,6 +30,17 @@ database_url = settings.DATABASE_URL
 config.set_main_option("sqlalchemy.url", database_url)
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the full-text search column and its
+    indexes, which live only in migrations and not on the models."""
+    if reflected and compare_to is None and name is not None:
+        if name == "search_vector" or name.startswith(
+            "ix_faq_translations_search_"
+        ):
+            return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -46,6 +57,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,6 +70,7 @@ def do_run_migrations(connection: Connection) -> None:
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
+        include_object=include_object,
         transaction_per_migration=True,
     )
 
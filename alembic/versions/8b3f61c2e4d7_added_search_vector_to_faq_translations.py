@@ -0,0 +1,71 @@
+"""added full-text search vector to faq_translations
+
+Revision ID: 8b3f61c2e4d7
+Revises: 5d2e8b7f0a63
+Create Date: 2025-02-07 10:21:55.803146
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3f61c2e4d7'
+down_revision: Union[str, None] = '5d2e8b7f0a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Languages with a Postgres text search configuration; everything else is
+# indexed with 'simple'. Kept in sync with FAQS_SEARCH_CONFIGS.
+SEARCH_CONFIGS = {
+    'en': 'english',
+    'es': 'spanish',
+    'fr': 'french',
+    'de': 'german',
+    'ru': 'russian',
+}
+LANGUAGES = ['en', 'hi', 'bn', 'es', 'fr', 'de', 'zh', 'ja', 'ru']
+
+
+def upgrade() -> None:
+    config = 'CASE language {} ELSE \'simple\'::regconfig END'.format(
+        ' '.join(
+            f"WHEN '{lang}' THEN '{name}'::regconfig"
+            for lang, name in SEARCH_CONFIGS.items()
+        )
+    )
+    # A stored generated column is computed for every existing row when it
+    # is added, which backfills the vectors, and kept up to date by Postgres
+    # on every insert and update afterwards.
+    op.add_column('faq_translations', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            f"setweight(to_tsvector({config}, translated_question), 'A') || "
+            f"setweight(to_tsvector({config}, translated_answer), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    # One partial GIN index per language, so a search only walks the
+    # postings of the language it is filtered on.
+    for lang in LANGUAGES:
+        op.create_index(
+            f'ix_faq_translations_search_{lang}',
+            'faq_translations',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_where=sa.text(f"language = '{lang}'"),
+        )
+
+
+def downgrade() -> None:
+    for lang in LANGUAGES:
+        op.drop_index(
+            f'ix_faq_translations_search_{lang}', table_name='faq_translations'
+        )
+    op.drop_column('faq_translations', 'search_vector')
@@ -0,0 +1,72 @@
+import time
+from typing import Callable
+
+from loguru import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency until it has had time to recover.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    allow() refuses every call. Once ``reset_timeout`` seconds have passed
+    it lets a single probe through (half-open): a success closes the
+    circuit, a failure opens it again for another ``reset_timeout``. A probe
+    that never reports back, e.g. because it was cancelled, just lets the
+    next one through after the same delay.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._clock = clock
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return False
+        # Restart the timer so only one probe goes out per reset_timeout.
+        self.state = HALF_OPEN
+        self._opened_at = self._clock()
+        return True
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.failures >= self.failure_threshold
+        ):
+            logger.warning(
+                f"Circuit {self.name} opened after {self.failures} "
+                f"consecutive failures; retrying in {self.reset_timeout}s"
+            )
+            self.state = OPEN
+            self.opens += 1
+            self._opened_at = self._clock()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+        }
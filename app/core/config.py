@@ -8,7 +8,39 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api"
     DATABASE_URL: str
     REDIS_URL: str
+    REDIS_READ_BUDGET: float = 0.25
+    REDIS_BULK_READ_BUDGET: float = 2.0
+    REDIS_WRITE_BUDGET: float = 1.0
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    REDIS_CIRCUIT_RESET_TIMEOUT: float = 5.0
     TEST_DATABASE_URL: str = None
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 5
+    DATABASE_POOL_TIMEOUT: float = 60.0
+    DATABASE_POOL_RECYCLE: int = 3600
+    DATABASE_READ_URLS: str = ""
+    DATABASE_REPLICA_MAX_LAG: float = 5.0
+    LOCAL_CACHE_MAX_ENTRIES: int = 256
+    LOCAL_CACHE_TTL: float = 30.0
+    TRANSLATION_WORKERS: int = 2
+    TRANSLATION_JOB_BATCH_SIZE: int = 9
+    TRANSLATION_JOB_MAX_ATTEMPTS: int = 5
+    TRANSLATION_JOB_LEASE_SECONDS: int = 120
+    TRANSLATION_POLL_INTERVAL: float = 1.0
+    TRANSLATION_QUEUE_DEPTH_TTL: float = 5.0
+    TRANSLATION_BACKEND: str = "google"
+    TRANSLATION_BATCH_SIZE: int = 64
+    TRANSLATION_BATCH_DELAY: float = 0.01
+    TRANSLATION_RATE_LIMIT: float = 5.0
+    TRANSLATION_RATE_BURST: int = 10
+    TRANSLATION_RATE_LIMIT_SHARED: bool = False
+    TRANSLATION_CONCURRENCY_INITIAL: int = 4
+    TRANSLATION_CONCURRENCY_MAX: int = 16
+    TRANSLATION_LATENCY_TARGET: float = 5.0
+    TRANSLATION_MEMORY_MAX_ENTRIES: int = 10000
+    TRANSLATION_MEMORY_EXPIRATION: int = 30 * 24 * 3600
+    SUGGEST_INDEX_MAX_ENTRIES: int = 100000
+    SUGGEST_INDEX_MAX_LENGTH: int = 200
 
 
 class DevelopmentSettings(Settings):
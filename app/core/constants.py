@@ -1 +1,29 @@
 SUPPORTED_LANGUAGES = ["en", "hi", "bn", "es", "fr", "de", "zh", "ja", "ru"]
+
+FAQS_MAX_PAGE_SIZE = 100
+
+FAQS_BULK_CHUNK_SIZE = 1000
+
+FAQS_EXPORT_BATCH_SIZE = 500
+FAQS_SNAPSHOT_BUCKET_SIZE = 256
+
+FAQS_SEARCH_DEFAULT_PAGE_SIZE = 20
+
+FAQS_SUGGEST_DEFAULT_LIMIT = 10
+
+FAQS_SUGGEST_MAX_LIMIT = 20
+
+FAQS_SEARCH_MAX_OFFSET = 1000
+
+FAQS_SEARCH_MAX_QUERY_LENGTH = 200
+
+# Postgres text search configurations per language; languages without one
+# are searched with 'simple'. Changing this needs a migration, since the
+# search_vector column is generated from the same mapping.
+FAQS_SEARCH_CONFIGS = {
+    "en": "english",
+    "es": "spanish",
+    "fr": "french",
+    "de": "german",
+    "ru": "russian",
+}
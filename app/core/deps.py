@@ -2,15 +2,28 @@ from typing import AsyncGenerator
 
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.session import AsyncSessionLocal
+from app.database.session import LazySession, ReadSessionLocal
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        except Exception as e:
-            logger.error(f"Error occurred with database session: {e}")
-            raise e
-        finally:
-            await session.close()
+    # Requests answered from the cache never create the session.
+    session = LazySession()
+    try:
+        yield session
+    except Exception as e:
+        logger.error(f"Error occurred with database session: {e}")
+        raise e
+    finally:
+        await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Like get_db, but on a read replica (see ReadSessionLocal)."""
+    session = LazySession(ReadSessionLocal)
+    try:
+        yield session
+    except Exception as e:
+        logger.error(f"Error occurred with database session: {e}")
+        raise e
+    finally:
+        await session.close()
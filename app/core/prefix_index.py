@@ -0,0 +1,94 @@
+import sys
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable
+
+
+def normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class PrefixIndex:
+    """Sorted array of normalized strings answering prefix queries with
+    bisect.
+
+    Holds at most ``max_entries`` entries; adding past that evicts the
+    oldest one. Keys and stored texts are truncated to ``max_length``
+    characters, so the footprint stays bounded however long the texts are.
+    """
+
+    def __init__(self, max_entries: int, max_length: int):
+        self.max_entries = max_entries
+        self.max_length = max_length
+        self.evictions = 0
+        self._keys: list[tuple[str, int]] = []
+        self._entries: OrderedDict[int, tuple[str, str]] = OrderedDict()
+        self._text_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry_id: int, text: str):
+        self.remove(entry_id)
+        text = text[: self.max_length]
+        key = normalize(text)[: self.max_length]
+        insort(self._keys, (key, entry_id))
+        self._entries[entry_id] = (key, text)
+        self._text_bytes += sys.getsizeof(key) + sys.getsizeof(text)
+        while len(self._entries) > self.max_entries:
+            self.remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def add_many(self, entries: Iterable[tuple[int, str]]):
+        """add() every ``(entry_id, text)`` in order, sorting the keys once
+        at the end instead of inserting them one by one, so loading n
+        entries is O(n log n) rather than O(n^2)."""
+        for entry_id, text in entries:
+            self._entries.pop(entry_id, None)
+            text = text[: self.max_length]
+            key = normalize(text)[: self.max_length]
+            self._entries[entry_id] = (key, text)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        self._keys = sorted(
+            (key, entry_id) for entry_id, (key, _) in self._entries.items()
+        )
+        self._text_bytes = sum(
+            sys.getsizeof(key) + sys.getsizeof(text)
+            for key, text in self._entries.values()
+        )
+
+    def remove(self, entry_id: int) -> bool:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return False
+        key, text = entry
+        del self._keys[bisect_left(self._keys, (key, entry_id))]
+        self._text_bytes -= sys.getsizeof(key) + sys.getsizeof(text)
+        return True
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        prefix = normalize(prefix)
+        results = []
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and len(results) < limit:
+            key, entry_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            results.append({"id": entry_id, "question": self._entries[entry_id][1]})  # noqa
+            position += 1
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            # Strings plus the containers and tuples referencing them.
+            "approx_bytes": self._text_bytes
+            + sys.getsizeof(self._keys)
+            + sys.getsizeof(self._entries)
+            + len(self._entries) * 2 * sys.getsizeof((None, None)),
+        }
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+from app.core import redis
+
+# Shared budgets are counted in one-second windows.
+SHARED_WINDOW_EXPIRATION = 2
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, in bursts of up to
+    ``burst``; acquire() waits, first come first served, until enough
+    tokens have accumulated.
+
+    Given a ``shared_key``, every process using that key also draws on one
+    budget of ``rate`` requests per second kept in Redis, so the limit holds
+    across all of them. If Redis is unavailable only the local bucket
+    applies.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        shared_key: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.shared_key = shared_key
+        self.waited = 0.0
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 1):
+        tokens = min(tokens, self.burst)
+        started = self._clock()
+        # Held while waiting, so waiters are served in arrival order.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+            if self.shared_key is not None:
+                await self._acquire_shared(tokens)
+        self.waited += self._clock() - started
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def _acquire_shared(self, tokens: int):
+        while True:
+            now = time.time()
+            window = int(now)
+            count = await redis.increment_counter(
+                f"{self.shared_key}:{window}",
+                tokens,
+                expiration=SHARED_WINDOW_EXPIRATION,
+            )
+            if count is None or count <= max(self.rate, tokens):
+                return
+            await asyncio.sleep(window + 1 - now)
+
+
+class AdaptiveConcurrencyLimit:
+    """Caps concurrent calls at a limit adjusted by AIMD.
+
+    A call that succeeds within ``latency_target`` seconds raises the limit
+    by 1/limit, i.e. by about one per round of calls at the current limit.
+    A failed or slower call multiplies it by ``backoff``, at most once per
+    round: calls that started before the last decrease don't count again.
+    The limit stays between ``minimum`` and ``maximum``.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_target: float,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self.decreases = 0
+        self._clock = clock
+        self._decreased_at = float("-inf")
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @asynccontextmanager
+    async def slot(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        started = self._clock()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            self.in_flight -= 1
+            self.record(
+                succeeded and self._clock() - started <= self.latency_target,
+                started,
+            )
+
+    def record(self, succeeded: bool, started: float):
+        if succeeded:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        elif started >= self._decreased_at:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+            self._decreased_at = self._clock()
+            self.decreases += 1
+        for _ in range(int(self.limit) - self.in_flight):
+            if not self._waiters:
+                break
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "decreases": self.decreases,
+        }
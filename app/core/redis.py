@@ -1,22 +1,27 @@
-from typing import Any, Optional
+import asyncio
+import functools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
 
 from loguru import logger
-from redis import ResponseError, asyncio as aioredis
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from redis import asyncio as aioredis
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_random_exponential,
-)
+from redis.exceptions import WatchError
 
+from app.core import metrics
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
 from app.core.config import settings
 
 
 REDIS_SOCKET_TIMEOUT: float = 5.0
 REDIS_SOCKET_CONNECT_TIMEOUT: float = 5.0
 REDIS_DEFAULT_CACHE_EXPIRATION = 3600
+REDIS_INVALIDATION_CHANNEL = "cache:invalidate"
+REDIS_INVALIDATION_RECONNECT_DELAY = 1.0
 
 redis = aioredis.from_url(
     settings.REDIS_URL,
@@ -25,14 +30,181 @@ redis = aioredis.from_url(
     socket_timeout=REDIS_SOCKET_TIMEOUT,
     socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
 )
+# Same server, but values come back as raw bytes (pre-serialized and
+# compressed payloads).
+redis_bytes = aioredis.from_url(
+    settings.REDIS_URL,
+    decode_responses=False,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+)
+
+# Shared by every call below. While it is open they fail immediately, so
+# callers fall back to the database instead of waiting on a dead server.
+circuit_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.REDIS_CIRCUIT_RESET_TIMEOUT,
+)
+
+
+class RedisCircuitOpenError(RedisConnectionError):
+    pass
+
+
+class LocalCache:
+    """In-process TTL + LRU cache of already-deserialized values.
+
+    Keys belong to a namespace (their prefix up to the first ``:`` after
+    it, e.g. ``faqs:hi`` for ``faqs:hi:page:0:20``). Namespaces are dropped
+    when an invalidation is published on ``REDIS_INVALIDATION_CHANNEL``, and
+    the TTL bounds staleness if a message is ever missed.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._epochs: dict[str, int] = {}
+        self._invalidated_at: dict[str, float] = {}
+        self._all_invalidated_at = float("-inf")
+
+    def epoch(self, namespace: str) -> int:
+        return self._epochs.get(namespace, 0)
+
+    def invalidated_within(self, namespace: str, seconds: float) -> bool:
+        """Whether the namespace was invalidated, i.e. its data changed, in
+        the last ``seconds``."""
+        invalidated_at = max(
+            self._invalidated_at.get(namespace, float("-inf")),
+            self._all_invalidated_at,
+        )
+        return time.monotonic() - invalidated_at < seconds
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, namespace: str, epoch: int):
+        # Drop values read before the namespace was last invalidated.
+        if self.epoch(namespace) != epoch:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str | None = None):
+        if namespace is None:
+            self._entries.clear()
+            for known in self._epochs:
+                self._epochs[known] += 1
+            self._all_invalidated_at = time.monotonic()
+            return
+        self._epochs[namespace] = self.epoch(namespace) + 1
+        self._invalidated_at[namespace] = time.monotonic()
+        prefix = f"{namespace}:"
+        for key in [
+            key
+            for key in self._entries
+            if key == namespace or key.startswith(prefix)
+        ]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+local_cache = LocalCache(
+    max_entries=settings.LOCAL_CACHE_MAX_ENTRIES,
+    ttl=settings.LOCAL_CACHE_TTL,
+)
+
+
+def _collect_local_cache_metrics():
+    stats = local_cache.stats()
+    requests = CounterMetricFamily(
+        "local_cache_requests",
+        "In-process L1 cache lookups by result.",
+        labels=["result"],
+    )
+    requests.add_metric(["hit"], stats["hits"])
+    requests.add_metric(["miss"], stats["misses"])
+    yield requests
+    yield GaugeMetricFamily(
+        "local_cache_entries",
+        "Entries held in the in-process L1 cache.",
+        value=stats["entries"],
+    )
+
+
+def _collect_circuit_metrics():
+    stats = circuit_breaker.stats()
+    state = GaugeMetricFamily(
+        "redis_circuit_state",
+        "1 for the Redis circuit breaker's current state.",
+        labels=["state"],
+    )
+    for name in (CLOSED, HALF_OPEN, OPEN):
+        state.add_metric([name], int(stats["state"] == name))
+    yield state
+    yield CounterMetricFamily(
+        "redis_circuit_opens",
+        "Times the Redis circuit breaker opened.",
+        value=stats["opens"],
+    )
+
+
+metrics.register_collector(_collect_local_cache_metrics)
+metrics.register_collector(_collect_circuit_metrics)
+_invalidation_listener: Optional[asyncio.Task] = None
+# Further pub/sub channels served by the invalidation listener, mapped to
+# (on_message, on_resubscribe). on_resubscribe runs after a reconnect,
+# since messages may have been missed in between.
+_channel_handlers: dict[str, tuple[Callable[[str], Any], Callable[[], Any]]] = {}  # noqa
 
 
 async def get_redis():
     return redis
 
 
+def add_channel_handler(
+    channel: str,
+    on_message: Callable[[str], Any],
+    on_resubscribe: Callable[[], Any],
+):
+    """Register a channel before start_invalidation_listener() is called."""
+    _channel_handlers[channel] = (on_message, on_resubscribe)
+
+
+async def start_invalidation_listener():
+    global _invalidation_listener
+    _invalidation_listener = asyncio.create_task(_listen_for_invalidations())
+
+
+async def stop_invalidation_listener():
+    if _invalidation_listener is not None:
+        _invalidation_listener.cancel()
+        await asyncio.gather(_invalidation_listener, return_exceptions=True)
+
+
 async def close_redis_connection():
     await redis.close()
+    await redis_bytes.close()
 
 
 async def set_redis_with_retry(
@@ -42,19 +214,17 @@ async def set_redis_with_retry(
         await _redis_set(key, value, expiration)
         return True
     except (RedisTimeoutError, RedisConnectionError) as e:
-        logger.error(
-            f"Failed to set key {key} in Redis after retries: {str(e)}"
-        )  # noqa
+        _failed("set_redis_with_retry", f"Failed to set key {key} in Redis", e)
         return False
 
 
 async def get_redis_with_retry(key: str) -> Optional[str]:
     try:
-        return await _redis_get(key)
+        value = await _redis_get(key)
+        _count_reads("get_redis_with_retry", [value])
+        return value
     except (RedisTimeoutError, RedisConnectionError) as e:
-        logger.error(
-            f"Failed to get key {key} from Redis after retries: {str(e)}"
-        )  # noqa
+        _failed("get_redis_with_retry", f"Failed to get key {key} from Redis", e)  # noqa
         return None
 
 
@@ -62,60 +232,612 @@ async def delete_redis_with_retry(key: str) -> Optional[str]:
     try:
         return await _redis_del(key)
     except (RedisTimeoutError, RedisConnectionError) as e:
-        logger.error(
-            f"Failed to delete key {key} from Redis after retries: {str(e)}"
-        )  # noqa
+        _failed("delete_redis_with_retry", f"Failed to delete key {key} from Redis", e)  # noqa
+        return False
+
+
+async def get_generation(namespace: str) -> Optional[int]:
+    """Current generation of a cache namespace, or None if Redis is down."""
+    try:
+        return await _get_generation(namespace)
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("get_generation", f"Failed to get generation of {namespace} from Redis", e)  # noqa
+        return None
+
+
+async def bump_generation(*namespaces: str) -> bool:
+    """Invalidate every key derived from a namespace's generation.
+
+    Old entries are not deleted; they become unreachable and expire on
+    their own TTL.
+    """
+    try:
+        await _bump_generations(namespaces)
+        return True
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("bump_generation", f"Failed to bump generation of {namespaces} in Redis", e)  # noqa
         return False
 
 
-async def flush_all_keys() -> bool:
+async def publish(channel: str, message: str) -> bool:
     try:
-        await _flush_db()
+        await _publish(channel, message)
         return True
-    except (RedisTimeoutError, RedisConnectionError, ResponseError) as e:
-        logger.error(f"Failed to flush keys from Redis after retries: {str(e)}")  # noqa
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("publish", f"Failed to publish to {channel} in Redis", e)
+        return False
+
+
+async def increment_counter(
+    key: str, amount: int, expiration: int
+) -> Optional[int]:
+    """Add ``amount`` to a counter that expires ``expiration`` seconds
+    after it is created; returns the new value, or None if Redis is down."""
+    try:
+        return await _increment_counter(key, amount, expiration)
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("increment_counter", f"Failed to increment {key} in Redis", e)  # noqa
+        return None
+
+
+def versioned_key(namespace: str, generation: int, *parts) -> str:
+    return ":".join([namespace, f"v{generation}", *map(str, parts)])
+
+
+async def acquire_lock(key: str, timeout: float) -> Optional[str]:
+    """Try to take a short-lived cross-process lock.
+
+    Returns a token to release it with, or None if it is held elsewhere. The
+    lock expires on its own after ``timeout``. It only exists to avoid
+    duplicate work, so it fails open when Redis is unavailable.
+    """
+    try:
+        return await _acquire_lock(key, timeout)
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("acquire_lock", f"Failed to acquire lock {key} in Redis", e)
+        return uuid.uuid4().hex
+
+
+async def release_lock(key: str, token: str) -> bool:
+    try:
+        return await _release_lock(key, token)
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("release_lock", f"Failed to release lock {key} in Redis", e)
+        return False
+
+
+# Versioned fields are hash fields stamped with the namespace generation they
+# were built from; a field written before the latest bump is never returned,
+# so they need no explicit invalidation.
+
+
+async def get_versioned_field(
+    namespace: str, key: str, field: str
+) -> tuple[Optional[int], Optional[bytes]]:
+    """Return the namespace's current generation and the field's value if
+    it was built from that generation, in one round-trip."""
+    try:
+        generation, value = await _get_versioned_field(namespace, key, field)
+        _count_reads("get_versioned_field", [value])
+        return generation, value
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("get_versioned_field", f"Failed to get field {field} of {key} from Redis", e)  # noqa
+        return None, None
+
+
+async def set_versioned_fields(
+    key: str,
+    values: dict[str, bytes],
+    generation: int,
+    expiration: int = REDIS_DEFAULT_CACHE_EXPIRATION,
+) -> bool:
+    try:
+        await _set_versioned_fields(key, values, generation, expiration)
+        return True
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("set_versioned_fields", f"Failed to set fields of {key} in Redis", e)  # noqa
+        return False
+
+
+# Indexed hashes keep entries in a hash (member -> value) alongside a sorted
+# set of the same members (scored by their id) for range reads. A hash is
+# only trusted once a full rebuild has stamped it with its build time, which
+# readers get back to decide whether it is due for a refresh.
+
+
+async def get_indexed_hashes(
+    keys: list[tuple[str, str]],
+) -> list[Optional[tuple[dict, float, int]]]:
+    """Several ``(namespace, key)`` indexed hashes in one round-trip, each
+    with its build time and the namespace generation it is at least as new
+    as; None for each hash that is not ready."""
+    try:
+        hashes = await _get_indexed_hashes(keys)
+        _count_reads("get_indexed_hashes", hashes)
+        return hashes
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("get_indexed_hashes", f"Failed to get hashes {keys} from Redis", e)  # noqa
+        return [None] * len(keys)
+
+
+async def get_indexed_hash_pages(
+    keys: list[tuple[str, str, str]], after: int, limit: int
+) -> list[Optional[tuple[list, float, int]]]:
+    """The same keyset page of several ``(namespace, key, index_key)``
+    indexed hashes, in two round-trips however many there are; stamped like
+    get_indexed_hashes."""
+    try:
+        pages = await _get_indexed_hash_pages(keys, after, limit)
+        _count_reads("get_indexed_hash_pages", pages)
+        return pages
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("get_indexed_hash_pages", f"Failed to get pages of hashes {keys} from Redis", e)  # noqa
+        return [None] * len(keys)
+
+
+async def get_hash_fields(
+    keys: list[tuple[str, str]], field: str
+) -> Optional[list[tuple[int, Optional[str]]]]:
+    """One field of several ``(namespace, key)`` hashes in a single
+    round-trip, each with its namespace's current generation. Entries are
+    read whether or not the hash has been fully rebuilt."""
+    try:
+        fields = await _get_hash_fields(keys, field)
+        _count_reads("get_hash_fields", [value for _, value in fields])
+        return fields
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("get_hash_fields", f"Failed to get field {field} of {keys} from Redis", e)  # noqa
+        return None
+
+
+async def fill_indexed_hashes(
+    fills: list[tuple[str, str, str, dict, int]],
+    expiration: int = REDIS_DEFAULT_CACHE_EXPIRATION,
+) -> bool:
+    """Add ``(namespace, key, index_key, {id: value}, expected_generation)``
+    entries read from the database after a miss.
+
+    Unlike update_indexed_hashes this doesn't bump generations: the entries
+    are not changes. The whole fill is skipped if any namespace moved past
+    its expected generation meanwhile, so it cannot resurrect a deleted
+    entry.
+    """
+    try:
+        await _fill_indexed_hashes(fills, expiration)
+        return True
+    except WatchError:
+        logger.info("Skipped filling hashes: they changed meanwhile")
+        return False
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("fill_indexed_hashes", "Failed to fill hashes in Redis", e)
+        return False
+
+
+async def replace_indexed_hash(
+    key: str,
+    index_key: str,
+    entries: dict,
+    namespace: str,
+    expected_generation: int,
+    expiration: int = REDIS_DEFAULT_CACHE_EXPIRATION,
+) -> bool:
+    """Atomically rebuild an indexed hash from ``{id: value}``.
+
+    The write is skipped if ``namespace`` moved past ``expected_generation``
+    meanwhile, so a rebuild computed from older data can never overwrite an
+    entry written by a concurrent update.
+    """
+    try:
+        await _replace_indexed_hash(
+            key, index_key, entries, namespace, expected_generation, expiration
+        )
+        return True
+    except WatchError:
+        logger.info(f"Skipped rebuilding hash {key}: it changed meanwhile")
+        return False
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("replace_indexed_hash", f"Failed to rebuild hash {key} in Redis", e)  # noqa
+        return False
+
+
+async def update_indexed_hashes(
+    updates: list[tuple[str, str, dict, list]],
+    namespaces: list[str],
+    expiration: int = REDIS_DEFAULT_CACHE_EXPIRATION,
+) -> bool:
+    """Apply ``(key, index_key, {id: value} to set, [ids] to delete)``
+    updates and bump ``namespaces`` in a single round-trip."""
+    try:
+        await _update_indexed_hashes(updates, namespaces, expiration)
+        return True
+    except (RedisTimeoutError, RedisConnectionError) as e:
+        _failed("update_indexed_hashes", "Failed to update hashes in Redis", e)
         return False
 
 
 #  private methods
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_random_exponential(multiplier=1, max=5),
-    retry=retry_if_exception_type((TimeoutError, ConnectionError)),
-    reraise=True,
-)
-async def _flush_db() -> None:
-    await redis.flushdb()
+def _guarded(budget: float, count_timeouts: bool = True):
+    """Run a Redis call through the circuit breaker within ``budget``
+    seconds.
 
+    There are no retries: a call that fails or runs out of time counts
+    against the breaker and raises a redis TimeoutError or ConnectionError
+    for the public wrapper to handle. With ``count_timeouts`` off, running
+    out of time still raises but is not counted: bulk reads can be slow
+    because of their size, which says nothing about whether Redis is up.
+    """
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_random_exponential(multiplier=1, max=5),
-    retry=retry_if_exception_type((TimeoutError, ConnectionError)),
-    reraise=True,
-)
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not circuit_breaker.allow():
+                raise RedisCircuitOpenError("Redis circuit breaker is open")
+            try:
+                result = await asyncio.wait_for(func(*args, **kwargs), budget)
+            except asyncio.TimeoutError as e:
+                if count_timeouts:
+                    circuit_breaker.record_failure()
+                raise RedisTimeoutError(
+                    f"Redis call exceeded its {budget}s budget"
+                ) from e
+            except (RedisTimeoutError, RedisConnectionError):
+                circuit_breaker.record_failure()
+                raise
+            except OSError as e:
+                circuit_breaker.record_failure()
+                raise RedisConnectionError(str(e)) from e
+            except Exception:
+                # Redis answered (e.g. a WatchError), so it is up.
+                circuit_breaker.record_success()
+                raise
+            circuit_breaker.record_success()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _failed(operation: str, message: str, e: Exception):
+    if isinstance(e, RedisCircuitOpenError):
+        # Logged once, when the circuit opened.
+        _count(operation, "rejected")
+        return
+    _count(operation, "error")
+    logger.error(f"{message}: {str(e)}")
+
+
+def _count(operation: str, result: str):
+    metrics.REDIS_REQUESTS.labels(operation, result).inc()
+
+
+def _count_reads(operation: str, values: list):
+    hits = sum(value is not None for value in values)
+    if hits:
+        metrics.REDIS_REQUESTS.labels(operation, "hit").inc(hits)
+    misses = len(values) - hits
+    if misses:
+        metrics.REDIS_REQUESTS.labels(operation, "miss").inc(misses)
+
+
+REDIS_GENERATION_KEY_PREFIX = "gen"
+REDIS_INDEXED_HASH_BUILT_AT_FIELD = "_built_at"
+
+
+@_guarded(settings.REDIS_READ_BUDGET)
+async def _get_generation(namespace: str) -> int:
+    generation = await redis.get(f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}")
+    return int(generation or 0)
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _bump_generations(namespaces: tuple) -> None:
+    for namespace in namespaces:
+        local_cache.invalidate(namespace)
+    async with redis.pipeline(transaction=False) as pipe:
+        for namespace in namespaces:
+            _incr_generation(pipe, namespace)
+            pipe.publish(REDIS_INVALIDATION_CHANNEL, namespace)
+        await pipe.execute()
+
+
+def _incr_generation(pipe, namespace: str):
+    # A generation starts from the current time in microseconds, so if Redis
+    # loses its data the new generations still never repeat an old one (they
+    # are also content versions, e.g. in ETags).
+    key = f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}"
+    pipe.set(key, time.time_ns() // 1000, nx=True)
+    pipe.incr(key)
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _publish(channel: str, message: str) -> None:
+    await redis.publish(channel, message)
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _increment_counter(key: str, amount: int, expiration: int) -> int:
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.incrby(key, amount)
+        pipe.expire(key, expiration, nx=True)
+        value, _ = await pipe.execute()
+    return value
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
 async def _redis_del(key: str) -> Optional[str]:
     result = await redis.delete(key)
     return result > 0
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_random_exponential(multiplier=1, max=5),
-    retry=retry_if_exception_type((TimeoutError, ConnectionError)),
-    reraise=True,
-)
+@_guarded(settings.REDIS_WRITE_BUDGET)
 async def _redis_set(key: str, value: Any, expiration: int) -> None:
     await redis.set(key, value, ex=expiration)
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_random_exponential(multiplier=1, max=5),
-    retry=retry_if_exception_type((TimeoutError, ConnectionError)),
-    reraise=True,
-)
+@_guarded(settings.REDIS_READ_BUDGET)
 async def _redis_get(key: str) -> Optional[str]:
     return await redis.get(key)
+
+
+@_guarded(settings.REDIS_BULK_READ_BUDGET, count_timeouts=False)
+async def _get_indexed_hashes(
+    keys: list[tuple[str, str]],
+) -> list[Optional[tuple[dict, float, int]]]:
+    # Generations are read before the entries: updates write both in one
+    # transaction, so the entries are never older than the generation.
+    async with redis.pipeline(transaction=False) as pipe:
+        for namespace, key in keys:
+            pipe.get(f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}")
+            pipe.hgetall(key)
+        results = await pipe.execute()
+
+    hashes = []
+    for generation, entries in zip(results[::2], results[1::2]):
+        built_at = entries.pop(REDIS_INDEXED_HASH_BUILT_AT_FIELD, None)
+        hashes.append(
+            None
+            if built_at is None
+            else (entries, float(built_at), int(generation or 0))
+        )
+    return hashes
+
+
+@_guarded(settings.REDIS_READ_BUDGET)
+async def _get_indexed_hash_pages(
+    keys: list[tuple[str, str, str]], after: int, limit: int
+) -> list[Optional[tuple[list, float, int]]]:
+    async with redis.pipeline(transaction=False) as pipe:
+        for namespace, key, index_key in keys:
+            pipe.get(f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}")
+            pipe.hget(key, REDIS_INDEXED_HASH_BUILT_AT_FIELD)
+            pipe.zrangebyscore(
+                index_key, f"({after}", "+inf", start=0, num=limit
+            )
+        results = await pipe.execute()
+    built = [
+        (key, built_at, members, int(generation or 0))
+        for (_, key, _), generation, built_at, members in zip(
+            keys, results[::3], results[1::3], results[2::3]
+        )
+    ]
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, built_at, members, _ in built:
+            if built_at is not None and members:
+                pipe.hmget(key, members)
+        values = iter(await pipe.execute())
+
+    pages = []
+    for key, built_at, members, generation in built:
+        if built_at is None:
+            pages.append(None)
+        elif not members:
+            pages.append(([], float(built_at), generation))
+        else:
+            pages.append(
+                (
+                    [value for value in next(values) if value is not None],
+                    float(built_at),
+                    generation,
+                )
+            )
+    return pages
+
+
+@_guarded(settings.REDIS_READ_BUDGET)
+async def _get_hash_fields(
+    keys: list[tuple[str, str]], field: str
+) -> list[tuple[int, Optional[str]]]:
+    async with redis.pipeline(transaction=False) as pipe:
+        for namespace, key in keys:
+            pipe.get(f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}")
+            pipe.hget(key, field)
+        results = await pipe.execute()
+    return [
+        (int(generation or 0), value)
+        for generation, value in zip(results[::2], results[1::2])
+    ]
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _fill_indexed_hashes(
+    fills: list[tuple[str, str, str, dict, int]], expiration: int
+) -> None:
+    generation_keys = [
+        f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}"
+        for namespace, *_ in fills
+    ]
+    async with redis.pipeline(transaction=True) as pipe:
+        await pipe.watch(*generation_keys)
+        for generation_key, (*_, expected_generation) in zip(
+            generation_keys, fills
+        ):
+            if int(await pipe.get(generation_key) or 0) != expected_generation:
+                raise WatchError(f"{generation_key} changed")
+
+        pipe.multi()
+        for _, key, index_key, entries, _ in fills:
+            pipe.hset(
+                key,
+                mapping={
+                    str(member): value for member, value in entries.items()
+                },
+            )
+            pipe.zadd(index_key, {str(member): member for member in entries})
+            pipe.expire(key, expiration, nx=True)
+            pipe.expire(index_key, expiration, nx=True)
+        await pipe.execute()
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _replace_indexed_hash(
+    key: str,
+    index_key: str,
+    entries: dict,
+    namespace: str,
+    expected_generation: int,
+    expiration: int,
+) -> None:
+    generation_key = f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}"
+    async with redis.pipeline(transaction=True) as pipe:
+        await pipe.watch(generation_key)
+        if int(await pipe.get(generation_key) or 0) != expected_generation:
+            raise WatchError(f"{generation_key} changed")
+
+        pipe.multi()
+        pipe.delete(key, index_key)
+        pipe.hset(
+            key,
+            mapping={
+                REDIS_INDEXED_HASH_BUILT_AT_FIELD: str(time.time()),
+                **{str(member): value for member, value in entries.items()},
+            },
+        )
+        if entries:
+            pipe.zadd(index_key, {str(member): member for member in entries})
+            pipe.expire(index_key, expiration)
+        pipe.expire(key, expiration)
+        await pipe.execute()
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _update_indexed_hashes(
+    updates: list[tuple[str, str, dict, list]],
+    namespaces: list[str],
+    expiration: int,
+) -> None:
+    async with redis.pipeline(transaction=True) as pipe:
+        for key, index_key, entries, deleted in updates:
+            if entries:
+                pipe.hset(
+                    key,
+                    mapping={
+                        str(member): value for member, value in entries.items()
+                    },
+                )
+                pipe.zadd(index_key, {str(member): member for member in entries})  # noqa
+                # Writes to a hash that was never rebuilt create a partial,
+                # not-ready hash; make sure it still expires.
+                pipe.expire(key, expiration, nx=True)
+                pipe.expire(index_key, expiration, nx=True)
+            if deleted:
+                pipe.hdel(key, *map(str, deleted))
+                pipe.zrem(index_key, *map(str, deleted))
+        for namespace in namespaces:
+            local_cache.invalidate(namespace)
+            _incr_generation(pipe, namespace)
+            pipe.publish(REDIS_INVALIDATION_CHANNEL, namespace)
+        await pipe.execute()
+
+
+@_guarded(settings.REDIS_BULK_READ_BUDGET, count_timeouts=False)
+async def _get_versioned_field(
+    namespace: str, key: str, field: str
+) -> tuple[int, Optional[bytes]]:
+    async with redis_bytes.pipeline(transaction=False) as pipe:
+        pipe.get(f"{REDIS_GENERATION_KEY_PREFIX}:{namespace}")
+        pipe.hget(key, field)
+        generation, value = await pipe.execute()
+
+    generation = int(generation or 0)
+    if value is None:
+        return generation, None
+    value_generation, _, value = value.partition(b":")
+    if int(value_generation) != generation:
+        return generation, None
+    return generation, value
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _set_versioned_fields(
+    key: str, values: dict[str, bytes], generation: int, expiration: int
+) -> None:
+    async with redis_bytes.pipeline(transaction=True) as pipe:
+        pipe.hset(
+            key,
+            mapping={
+                field: b"%d:%b" % (generation, value)
+                for field, value in values.items()
+            },
+        )
+        # Bounded from the first write; stale fields are never read back.
+        pipe.expire(key, expiration, nx=True)
+        await pipe.execute()
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _acquire_lock(key: str, timeout: float) -> Optional[str]:
+    token = uuid.uuid4().hex
+    acquired = await redis.set(key, token, nx=True, px=int(timeout * 1000))
+    return token if acquired else None
+
+
+@_guarded(settings.REDIS_WRITE_BUDGET)
+async def _release_lock(key: str, token: str) -> bool:
+    # Only delete the lock if it is still ours; it may have expired and been
+    # taken by another process in the meantime.
+    async with redis.pipeline(transaction=True) as pipe:
+        await pipe.watch(key)
+        if await pipe.get(key) != token:
+            await pipe.unwatch()
+            return False
+        pipe.multi()
+        pipe.delete(key)
+        try:
+            await pipe.execute()
+        except WatchError:
+            return False
+    return True
+
+
+async def _listen_for_invalidations() -> None:
+    subscribed_before = False
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(
+                    REDIS_INVALIDATION_CHANNEL, *_channel_handlers
+                )
+                # Messages may have been missed while disconnected.
+                local_cache.invalidate()
+                if subscribed_before:
+                    for _, on_resubscribe in _channel_handlers.values():
+                        on_resubscribe()
+                subscribed_before = True
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    if message["channel"] == REDIS_INVALIDATION_CHANNEL:
+                        local_cache.invalidate(message["data"])
+                    else:
+                        on_message, _ = _channel_handlers[message["channel"]]
+                        on_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except (RedisTimeoutError, RedisConnectionError) as e:
+            logger.error(f"Lost Redis invalidation subscription: {str(e)}")
+            local_cache.invalidate()
+            await asyncio.sleep(REDIS_INVALIDATION_RECONNECT_DELAY)
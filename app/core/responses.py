@@ -0,0 +1,125 @@
+import asyncio
+import gzip
+import hashlib
+from http import HTTPStatus
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Payloads smaller than this are sent uncompressed; the framing overhead
+# would outweigh the savings.
+COMPRESSION_MIN_SIZE = 512
+
+# Bodies are compressed on the request that first misses the cache, so the
+# levels trade a little size for speed: brotli 11 takes over a second on a
+# large language's list, brotli 5 about 10 ms.
+COMPRESSORS = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)
+# Preferred first when the client accepts several equally.
+ENCODING_PREFERENCE = ["br", "gzip"]
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]  # noqa
+    return etag.removeprefix("W/") in candidates
+
+
+async def compress(body: bytes, encoding: str) -> tuple[str, bytes]:
+    """``body`` in ``encoding`` if it is worth compressing, else as-is;
+    returns the content-coding used and the bytes. Compression runs in a
+    worker thread so a large body doesn't stall the event loop."""
+    if encoding not in COMPRESSORS or len(body) < COMPRESSION_MIN_SIZE:
+        return "identity", body
+    return encoding, await asyncio.to_thread(COMPRESSORS[encoding], body)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    if not accept_encoding:
+        return "identity"
+
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best = "identity"
+    best_quality = 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in COMPRESSORS:
+            continue
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def not_modified(
+    etag: str, cache_control: str = "public, no-cache"
+) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={
+            "ETag": etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        },
+    )
+
+
+def conditional_response(
+    body: bytes,
+    etag: str,
+    if_none_match: Optional[str],
+    media_type: str = "application/json",
+    cache_control: str = "public, no-cache",
+    encoding: str = "identity",
+) -> Response:
+    """Serve ``body`` with its ETag, or 304 if the client already has it.
+
+    ``no-cache`` lets clients keep the response but makes them revalidate it
+    on every use, which is answered without a body when nothing changed.
+    ``body`` is sent as-is; ``encoding`` names the content-coding it is
+    already in.
+    """
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
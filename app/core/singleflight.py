@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs ``fn``; everyone arriving while it is in
+    flight awaits the same result (or exception) instead of running it again.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" when nobody else was waiting.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
@@ -1,2 +1,3 @@
 from app.models.base import *  # noqa
 from app.models.faq import *  # noqa
+from app.models.translation_job import *  # noqa
@@ -1,18 +1,140 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from typing import Any, Callable, Optional
 
+import orjson
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core import metrics
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=5,
-    pool_recycle=3600,
-    pool_timeout=60,
-)
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        # JSON columns (faq_snapshots) hold whole FAQ lists.
+        json_serializer=lambda value: orjson.dumps(value).decode(),
+        json_deserializer=orjson.loads,
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
 
 AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
 )
+
+# Optional read replicas, from a comma-separated DATABASE_READ_URLS.
+read_engines = [
+    _create_engine(url.strip())
+    for url in settings.DATABASE_READ_URLS.split(",")
+    if url.strip()
+]
+_read_sessionmakers = [
+    async_sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    for read_engine in read_engines
+]
+_next_replica = 0
+
+
+def ReadSessionLocal() -> AsyncSession:
+    """A session on the least busy read replica, or on the primary when
+    none are configured.
+
+    Replicas may lag behind the primary, so only use this for reads that
+    can miss the latest writes. Ties go round-robin, which also spreads
+    sessions created before any of them has checked out a connection.
+    """
+    global _next_replica
+    if not _read_sessionmakers:
+        return AsyncSessionLocal()
+    count = len(_read_sessionmakers)
+    index = min(
+        ((_next_replica + offset) % count for offset in range(count)),
+        key=lambda i: _checked_out(read_engines[i]),
+    )
+    _next_replica = (index + 1) % count
+    return _read_sessionmakers[index]()
+
+
+class LazySession:
+    """Stands in for an AsyncSession that is only created on first use.
+
+    Requests answered from the cache never create one. close() returns the
+    connection to the pool; the session can still be used afterwards, and
+    checks out a new connection if it is.
+    """
+
+    def __init__(
+        self, factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+def _checked_out(pool_engine) -> int:
+    pool = pool_engine.sync_engine.pool
+    return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+
+def _collect_pool_metrics():
+    gauges = {
+        "size": GaugeMetricFamily(
+            "db_pool_size",
+            "Configured connection pool size.",
+            labels=["database"],
+        ),
+        "checked_out": GaugeMetricFamily(
+            "db_pool_checked_out",
+            "Connections currently checked out of the pool.",
+            labels=["database"],
+        ),
+        "checked_in": GaugeMetricFamily(
+            "db_pool_checked_in",
+            "Idle connections in the pool.",
+            labels=["database"],
+        ),
+        "overflow": GaugeMetricFamily(
+            "db_pool_overflow",
+            "Connections open beyond pool_size (negative while the pool is "
+            "still filling).",
+            labels=["database"],
+        ),
+    }
+    engines = {"primary": engine}
+    engines.update(
+        (f"replica-{i}", read_engine)
+        for i, read_engine in enumerate(read_engines)
+    )
+    for name, pool_engine in engines.items():
+        pool = pool_engine.sync_engine.pool
+        # Only queue pools keep these counters.
+        if not hasattr(pool, "checkedout"):
+            continue
+        gauges["size"].add_metric([name], pool.size())
+        gauges["checked_out"].add_metric([name], pool.checkedout())
+        gauges["checked_in"].add_metric([name], pool.checkedin())
+        gauges["overflow"].add_metric([name], pool.overflow())
+    yield from gauges.values()
+
+
+metrics.register_collector(_collect_pool_metrics)
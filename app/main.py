@@ -1,12 +1,25 @@
-from fastapi import FastAPI, HTTPException, Request
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request
 from contextlib import asynccontextmanager
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from loguru import logger
-from app.core.redis import close_redis_connection
+from app.core.redis import (
+    close_redis_connection,
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from app.services import suggest, translation_queue
+from app.core.responses import (
+    ORJSONResponse,
+    conditional_response,
+    make_etag,
+)
 from app.exceptions.exception import CustomException
 from app.schemas.response import APIResponse, ErrorResponse
-from app.routers import faq
+from app.routers import faq, translation
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
@@ -21,17 +34,29 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 async def lifespan(app: FastAPI):
     try:
         logger.info("Starting the server...")
+        suggest.register()
+        await start_invalidation_listener()
+        await suggest.build()
+        await translation_queue.start_workers()
         yield
         logger.info("Closing the server...")
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         raise
     finally:
+        logger.info("Stopping translation workers...")
+        await translation_queue.stop_workers()
+        await suggest.stop()
+        await stop_invalidation_listener()
         logger.info("closing Redis connection...")
         await close_redis_connection()
 
 
-app = FastAPI(title="BharatFD", lifespan=lifespan)
+app = FastAPI(
+    title="BharatFD",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -39,6 +64,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -47,20 +73,43 @@ async def root():
         success=True,
         message="Server running successfully!",
     )
-    return JSONResponse(status_code=200, content=api_response.model_dump())
+    return ORJSONResponse(status_code=200, content=api_response.model_dump())
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    await translation_queue.record_queue_depth()
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def render_page(
+    request: Request, name: str, if_none_match: Optional[str]
+) -> Response:
+    page = templates.TemplateResponse(request, name)
+    return conditional_response(
+        page.body,
+        make_etag(page.body),
+        if_none_match,
+        media_type="text/html",
+    )
 
 
 @app.get("/user", response_class=HTMLResponse)
-async def get_user_page(request: Request):
-    return templates.TemplateResponse("user_page.html", {"request": request})
+async def get_user_page(
+    request: Request, if_none_match: Optional[str] = Header(None)
+):
+    return render_page(request, "user_page.html", if_none_match)
 
 
 @app.get("/admin", response_class=HTMLResponse)
-async def get_admin_page(request: Request):
-    return templates.TemplateResponse("admin_page.html", {"request": request})
+async def get_admin_page(
+    request: Request, if_none_match: Optional[str] = Header(None)
+):
+    return render_page(request, "admin_page.html", if_none_match)
 
 
 app.include_router(faq.router, prefix=settings.API_PREFIX)
+app.include_router(translation.router, prefix=settings.API_PREFIX)
 
 
 @app.exception_handler(HTTPException)
@@ -84,7 +133,7 @@ async def generic_exception_handler(request: Request, exception: Exception):
         )
         status_code = 500
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
         content=error_response.model_dump(),
     )
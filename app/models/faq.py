@@ -1,7 +1,12 @@
 from fastapi import HTTPException
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, select, delete  # noqa
-from sqlalchemy.orm import relationship, selectinload
+from typing import AsyncIterator
+from sqlalchemy import JSON, Column, Index, Integer, String, Text, ForeignKey, select, delete, insert, update, and_, or_, bindparam, cast, func, literal, literal_column, UniqueConstraint  # noqa
+from sqlalchemy.dialects.postgresql import JSONB, REGCONFIG, TSVECTOR
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import relationship
+from app.core import constants
 from app.database.base import Base
+from app.models.translation_job import TranslationJob
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -14,6 +19,9 @@ class FAQ(Base):
     translations = relationship(
         "FAQTranslation", back_populates="faq", cascade="all, delete-orphan"
     )
+    translation_jobs = relationship(
+        "TranslationJob", back_populates="faq", cascade="all, delete-orphan"
+    )
 
     @classmethod
     async def delete_faq(cls, faq_id: int, db: AsyncSession):
@@ -22,46 +30,155 @@ class FAQ(Base):
             raise HTTPException(status_code=404, detail="FAQ not found")
 
         await db.execute(delete(cls).where(cls.id == faq_id))
+        await FAQSnapshot.remove_faq(faq_id=faq_id, db=db)
         await db.commit()
 
+    @classmethod
+    async def get_faq(cls, faq_id: int, db: AsyncSession):
+        return await db.get(cls, faq_id)
+
     @classmethod
     async def create_faq(
-        cls, question: str | None, answer: str, language: str, db: AsyncSession
+        cls,
+        question: str | None,
+        answer: str,
+        language: str,
+        db: AsyncSession,
+        translation_languages: list[str] = (),
     ):
-        faq_instance = cls(question=question, answer=answer, language=language)
+        # Translation jobs are committed with the FAQ so every FAQ is
+        # guaranteed to get translated, even if the process dies right after.
+        faq_instance = cls(
+            question=question,
+            answer=answer,
+            language=language,
+            translation_jobs=[
+                TranslationJob(language=lang) for lang in translation_languages
+            ],
+        )
         db.add(faq_instance)
         await db.commit()
         await db.refresh(faq_instance)
         return faq_instance
 
     @classmethod
-    async def get_translated_text(cls, lang: str, db: AsyncSession) -> dict:
+    async def bulk_create_faqs(
+        cls,
+        faqs: list[dict],
+        db: AsyncSession,
+        translation_languages: list[str] = (),
+    ) -> list[int]:
+        # Multi-row INSERT ... RETURNING for the FAQs and their translation
+        # jobs, committed as one transaction per call.
+        result = await db.execute(
+            insert(cls).returning(cls.id, sort_by_parameter_order=True), faqs
+        )
+        faq_ids = list(result.scalars().all())
+        if translation_languages:
+            await db.execute(
+                insert(TranslationJob),
+                [
+                    {"faq_id": faq_id, "language": lang}
+                    for faq_id in faq_ids
+                    for lang in translation_languages
+                ],
+            )
+        await db.commit()
+        return faq_ids
 
-        faq_instance = await db.execute(
-            select(cls).options(selectinload(cls.translations))
+    @classmethod
+    async def stream_with_translations(
+        cls,
+        db: AsyncSession,
+        languages: list[str],
+        after_id: int | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        # Server-side cursor over FAQs joined to the chosen translations,
+        # fetched batch_size rows at a time. Rows arrive ordered by FAQ id,
+        # so each FAQ is complete once the next id shows up and only one
+        # FAQ is held in memory at a time.
+        query = (
+            select(
+                cls.id,
+                cls.question,
+                cls.answer,
+                cls.language,
+                cls.created_at,
+                FAQTranslation.language.label("translation_language"),
+                FAQTranslation.translated_question,
+                FAQTranslation.translated_answer,
+            )
+            .outerjoin(
+                FAQTranslation,
+                and_(
+                    FAQTranslation.faq_id == cls.id,
+                    FAQTranslation.language.in_(languages),
+                ),
+            )
+            .order_by(cls.id)
+            .execution_options(yield_per=batch_size)
         )
+        if after_id is not None:
+            query = query.where(cls.id > after_id)
 
-        faqs_instances = faq_instance.scalars().all()
-        if not faq_instance:
-            raise HTTPException(status_code=400)
+        result = await db.stream(query)
+        faq = None
+        async for row in result.mappings():
+            if faq is None or faq["id"] != row["id"]:
+                if faq is not None:
+                    yield faq
+                faq = {
+                    "id": row["id"],
+                    "question": row["question"],
+                    "answer": row["answer"],
+                    "language": row["language"],
+                    "created_at": row["created_at"],
+                    "translations": {},
+                }
+            if row["translation_language"] is not None:
+                faq["translations"][row["translation_language"]] = {
+                    "question": row["translated_question"],
+                    "answer": row["translated_answer"],
+                }
+        if faq is not None:
+            yield faq
 
-        translated_faqs = []
+    @classmethod
+    async def get_translated_text(
+        cls,
+        lang: str,
+        db: AsyncSession,
+        limit: int | None = None,
+        after_id: int | None = None,
+    ) -> list:
+        # Read straight from faq_translations so only the requested language's
+        # rows are fetched, and return plain rows instead of ORM objects.
+        query = (
+            select(
+                FAQTranslation.faq_id.label("id"),
+                FAQTranslation.translated_question.label("question"),
+                FAQTranslation.translated_answer.label("answer"),
+            )
+            .where(FAQTranslation.language == lang)
+            .order_by(FAQTranslation.faq_id)
+        )
+        # Keyset pagination: seek past the last faq_id of the previous page
+        # on the (language, faq_id) index instead of using OFFSET.
+        if after_id is not None:
+            query = query.where(FAQTranslation.faq_id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
 
-        for faq_instance in faqs_instances:
-            for translation in faq_instance.translations:
-                if translation.language == lang:
-                    translated_faqs.append(
-                        {
-                            "id": translation.faq_id,
-                            "question": translation.translated_question,
-                            "answer": translation.translated_answer,
-                        }
-                    )
-        return translated_faqs
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings().all()]
 
 
 class FAQTranslation(Base):
     __tablename__ = "faq_translations"
+    __table_args__ = (
+        Index("ix_faq_translations_language_faq_id", "language", "faq_id"),
+    )
 
     faq_id = Column(Integer, ForeignKey("faqs.id", ondelete="CASCADE"))
     language = Column(String(10), nullable=False)
@@ -70,6 +187,36 @@ class FAQTranslation(Base):
 
     faq = relationship("FAQ", back_populates="translations")
 
+    @classmethod
+    async def get_translations(
+        cls, faq_id: int, languages: list[str], db: AsyncSession
+    ) -> list:
+        result = await db.execute(
+            select(
+                cls.faq_id.label("id"),
+                cls.language,
+                cls.translated_question.label("question"),
+                cls.translated_answer.label("answer"),
+            ).where(cls.faq_id == faq_id, cls.language.in_(languages))
+        )
+        return [dict(row) for row in result.mappings().all()]
+
+    @classmethod
+    async def stream_questions(
+        cls, db: AsyncSession, batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        result = await db.stream(
+            select(
+                cls.faq_id.label("id"),
+                cls.language,
+                cls.translated_question.label("question"),
+            )
+            .order_by(cls.faq_id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for row in result.mappings():
+            yield row
+
     @classmethod
     async def add_faq_translation(
         cls,
@@ -89,3 +236,233 @@ class FAQTranslation(Base):
         await db.commit()
         await db.refresh(translation_instance)
         return translation_instance
+
+    @classmethod
+    async def replace_faq_translation(
+        cls,
+        db: AsyncSession,
+        translated_question: str,
+        faq_id: int,
+        translated_answer: str,
+        lang: str,
+    ):
+        # Left uncommitted so the caller can commit it atomically with its
+        # own bookkeeping; replacing keeps retried translations idempotent.
+        await db.execute(
+            delete(cls).where(cls.faq_id == faq_id, cls.language == lang)
+        )
+        translation_instance = cls(
+            faq_id=faq_id,
+            translated_question=translated_question,
+            translated_answer=translated_answer,
+            language=lang,
+        )
+        db.add(translation_instance)
+        return translation_instance
+
+    @classmethod
+    async def search(
+        cls,
+        lang: str,
+        text: str,
+        db: AsyncSession,
+        limit: int,
+        offset: int = 0,
+    ) -> list:
+        if db.get_bind().dialect.name != "postgresql":
+            return await cls._search_like(lang, text, db, limit, offset)
+
+        # search_vector is a generated column created by migration and kept
+        # off the model, so it is referenced by name here.
+        search_vector = literal_column(
+            "faq_translations.search_vector", type_=TSVECTOR
+        )
+        config = constants.FAQS_SEARCH_CONFIGS.get(lang, "simple")
+        ts_query = func.websearch_to_tsquery(cast(config, REGCONFIG), text)
+        rank = func.ts_rank_cd(search_vector, ts_query)
+        query = (
+            select(
+                cls.faq_id.label("id"),
+                cls.translated_question.label("question"),
+                cls.translated_answer.label("answer"),
+            )
+            # The language is rendered inline rather than bound so the
+            # planner can match it to that language's partial GIN index.
+            .where(
+                cls.language == bindparam("lang", lang, literal_execute=True),
+                search_vector.op("@@")(ts_query),
+            )
+            .order_by(rank.desc(), cls.faq_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+
+    @classmethod
+    async def _search_like(
+        cls, lang: str, text: str, db: AsyncSession, limit: int, offset: int
+    ) -> list:
+        # Substring match for databases without full-text search, such as
+        # SQLite; unranked, in id order.
+        pattern = "%{}%".format(
+            text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        query = (
+            select(
+                cls.faq_id.label("id"),
+                cls.translated_question.label("question"),
+                cls.translated_answer.label("answer"),
+            )
+            .where(
+                cls.language == lang,
+                or_(
+                    cls.translated_question.ilike(pattern, escape="\\"),
+                    cls.translated_answer.ilike(pattern, escape="\\"),
+                ),
+            )
+            .order_by(cls.faq_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+
+
+class FAQSnapshot(Base):
+    """Each language's published FAQs, denormalized into JSON objects of
+    faq id -> {"question", "answer"}, one row per language and bucket of
+    FAQS_SNAPSHOT_BUCKET_SIZE consecutive ids.
+
+    Kept up to date entry by entry in the same transactions that store a
+    translation or delete a FAQ, so a language's full list is a short range
+    fetch on (language, bucket) instead of being assembled row by row from
+    faq_translations. Postgres rewrites a whole JSONB value (and logs it to
+    the WAL) on every update, so the bucket size trades the number of rows
+    a full read fetches against how much each update rewrites.
+    """
+
+    __tablename__ = "faq_snapshots"
+    __table_args__ = (UniqueConstraint("language", "bucket"),)
+
+    language = Column(String(10), nullable=False)
+    bucket = Column(Integer, nullable=False)
+    faqs = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+
+    @classmethod
+    async def get_faqs(cls, lang: str, db: AsyncSession) -> list | None:
+        """The language's FAQs in id order, or None if it has no snapshot."""
+        result = await db.execute(
+            select(cls.faqs).where(cls.language == lang).order_by(cls.bucket)
+        )
+        buckets = result.scalars().all()
+        if not buckets:
+            return None
+        return [
+            {"id": int(faq_id), "question": entry["question"], "answer": entry["answer"]}  # noqa
+            for faqs in buckets
+            for faq_id, entry in sorted(
+                faqs.items(), key=lambda item: int(item[0])
+            )
+        ]
+
+    @classmethod
+    async def set_entry(
+        cls,
+        lang: str,
+        faq_id: int,
+        question: str,
+        answer: str,
+        db: AsyncSession,
+    ):
+        # Left uncommitted, like replace_faq_translation, so the snapshot
+        # changes atomically with the translation it mirrors.
+        bucket = cls._bucket(faq_id)
+        entry = {str(faq_id): {"question": question, "answer": answer}}
+        if db.get_bind().dialect.name == "postgresql":
+            # Merged into the stored document by Postgres, under the row
+            # lock, without reading it back.
+            statement = pg_insert(cls).values(
+                language=lang, bucket=bucket, faqs=entry
+            )
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[cls.language, cls.bucket],
+                    set_={
+                        "faqs": cls.faqs.op("||")(statement.excluded.faqs),
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+            return
+
+        snapshots = await cls._lock_snapshots(db, bucket, lang)
+        if not snapshots:
+            db.add(cls(language=lang, bucket=bucket, faqs=entry))
+        else:
+            snapshots[0].faqs = {**snapshots[0].faqs, **entry}
+
+    @classmethod
+    async def remove_faq(cls, faq_id: int, db: AsyncSession):
+        """Drop a FAQ from every language's snapshot; left uncommitted."""
+        bucket = cls._bucket(faq_id)
+        if db.get_bind().dialect.name == "postgresql":
+            # Every language is listed so the lookup can use the unique
+            # (language, bucket) index instead of scanning the table.
+            await db.execute(
+                update(cls)
+                .where(
+                    cls.language.in_(constants.SUPPORTED_LANGUAGES),
+                    cls.bucket == bucket,
+                )
+                .values(
+                    faqs=cls.faqs.op("-")(literal(str(faq_id))),
+                    updated_at=func.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            return
+
+        for snapshot in await cls._lock_snapshots(db, bucket):
+            if str(faq_id) in snapshot.faqs:
+                snapshot.faqs = {
+                    key: entry
+                    for key, entry in snapshot.faqs.items()
+                    if key != str(faq_id)
+                }
+
+    @classmethod
+    async def rebuild(cls, lang: str, db: AsyncSession):
+        """Recompute a language's snapshot from faq_translations, for rows
+        written around the snapshot (e.g. bulk loads); left uncommitted."""
+        buckets = {}
+        for faq in await FAQ.get_translated_text(lang=lang, db=db):
+            buckets.setdefault(cls._bucket(faq["id"]), {})[str(faq["id"])] = {
+                "question": faq["question"],
+                "answer": faq["answer"],
+            }
+        await db.execute(delete(cls).where(cls.language == lang))
+        db.add_all(
+            cls(language=lang, bucket=bucket, faqs=faqs)
+            for bucket, faqs in buckets.items()
+        )
+
+    @staticmethod
+    def _bucket(faq_id: int) -> int:
+        return faq_id // constants.FAQS_SNAPSHOT_BUCKET_SIZE
+
+    @classmethod
+    async def _lock_snapshots(
+        cls, db: AsyncSession, bucket: int, lang: str | None = None
+    ) -> list:
+        # Read-modify-write fallback for databases without JSONB operators;
+        # filtered on (language, bucket) to use the unique index.
+        languages = (
+            [lang] if lang is not None else constants.SUPPORTED_LANGUAGES
+        )
+        result = await db.execute(
+            select(cls)
+            .where(cls.language.in_(languages), cls.bucket == bucket)
+            .with_for_update()
+        )
+        return list(result.scalars().all())
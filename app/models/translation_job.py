@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import relationship
+
+from app.models.base import Base
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TranslationJob(Base):
+    __tablename__ = "translation_jobs"
+    __table_args__ = (
+        UniqueConstraint("faq_id", "language"),
+        Index("ix_translation_jobs_status_available_at", "status", "available_at"),  # noqa
+    )
+
+    faq_id = Column(
+        Integer,
+        ForeignKey("faqs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    language = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False, default=JOB_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    # When the job may next be picked up. While a job is running this is its
+    # lease expiry, so jobs held by a crashed worker become claimable again.
+    available_at = Column(DateTime, nullable=False, default=utcnow)
+
+    faq = relationship("FAQ", back_populates="translation_jobs")
+
+    @classmethod
+    async def claim(
+        cls, db: AsyncSession, batch_size: int, lease_seconds: int
+    ) -> list:
+        now = utcnow()
+        claimable = (
+            select(cls.id)
+            .where(
+                cls.status.in_([JOB_PENDING, JOB_RUNNING]),
+                cls.available_at <= now,
+            )
+            .order_by(cls.available_at, cls.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(cls)
+            .where(cls.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=JOB_RUNNING,
+                attempts=cls.attempts + 1,
+                available_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(cls.id, cls.faq_id, cls.language, cls.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        jobs = [dict(row) for row in result.mappings().all()]
+        await db.commit()
+        return jobs
+
+    @classmethod
+    async def mark_done(cls, job_id: int, db: AsyncSession):
+        # Not committed here: the worker commits this together with the
+        # translation it stored, so a job is never done without its row.
+        await db.execute(
+            update(cls)
+            .where(cls.id == job_id)
+            .values(status=JOB_DONE, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    async def mark_failed(
+        cls,
+        job_id: int,
+        error: str,
+        retry_in: float | None,
+        db: AsyncSession,
+    ):
+        values = {"last_error": error}
+        if retry_in is None:
+            values["status"] = JOB_FAILED
+        else:
+            values["status"] = JOB_PENDING
+            values["available_at"] = utcnow() + timedelta(seconds=retry_in)
+
+        await db.execute(
+            update(cls)
+            .where(cls.id == job_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    @classmethod
+    async def get_status_for_faq(cls, faq_id: int, db: AsyncSession) -> list:
+        result = await db.execute(
+            select(cls.language, cls.status, cls.attempts, cls.last_error)
+            .where(cls.faq_id == faq_id)
+            .order_by(cls.language)
+        )
+        return [dict(row) for row in result.mappings().all()]
+
+    @classmethod
+    async def count_by_status(
+        cls, statuses: list[str], db: AsyncSession
+    ) -> dict[str, int]:
+        result = await db.execute(
+            select(cls.status, func.count())
+            .where(cls.status.in_(statuses))
+            .group_by(cls.status)
+        )
+        counts = dict(result.all())
+        return {status: counts.get(status, 0) for status in statuses}
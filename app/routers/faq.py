@@ -1,13 +1,30 @@
 from http import HTTPStatus
-import json
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Optional
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Request,
+)
+from fastapi.responses import StreamingResponse
+import orjson
 from loguru import logger
-from app.core import redis
-from app.core.deps import get_db
+from app.core.deps import get_db, get_read_db
+from app.core.responses import (
+    ORJSONResponse,
+    choose_encoding,
+    conditional_response,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
 from app.schemas.request import CreateFAQRequest
 from app.schemas.response import APIResponse
 from app.services import faq as faq_service
+from app.services import faq_cache
+from app.services import suggest as suggest_service
 from app.core import constants
 
 
@@ -29,23 +46,13 @@ async def create_faq(request: CreateFAQRequest, db=Depends(get_db)):
             db=db,
         )
 
-        cache_key = f"faqs:{request.language}"
-        cached_faqs = await redis.get_redis_with_retry(cache_key)
-
-        if cached_faqs:
-            faqs = json.loads(cached_faqs)
-            faqs.append(faq_dto.model_dump())
-            await redis.set_redis_with_retry(
-                cache_key, json.dumps(faqs), expiration=3600
-            )
-
         api_response = APIResponse(
             success=True,
             message="FAQ created successfully!",
             data=faq_dto.model_dump(),
         )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=HTTPStatus.CREATED, content=api_response.model_dump()
         )
     except Exception as e:
@@ -53,23 +60,166 @@ async def create_faq(request: CreateFAQRequest, db=Depends(get_db)):
         raise e
 
 
-@router.get("/faqs/")
-async def get_faqs(lang: str = "en", db=Depends(get_db)):
+def _parse_languages(lang: str) -> list[str]:
+    languages = list(
+        dict.fromkeys(
+            language.strip() for language in lang.split(",") if language.strip()  # noqa
+        )
+    )
+    if not languages:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="At least one language is required.",
+        )
+    for language in languages:
+        if language not in constants.SUPPORTED_LANGUAGES:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"Language '{language}' is not supported.",
+            )
+    return languages
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+async def _iter_ndjson(request: Request):
+    # Parse line by line as the body streams in so large uploads are
+    # inserted chunk by chunk instead of being buffered whole.
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _loads_item(line)
+    if buffer.strip():
+        yield _loads_item(buffer)
+
+
+async def _iter_json_array(request: Request):
+    try:
+        items = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Request body must be a JSON array or NDJSON.",
+        )
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Request body must be a JSON array or NDJSON.",
+        )
+    for item in items:
+        yield item
+
+
+def _loads_item(line: bytes):
+    # A malformed line is reported as a failed item rather than failing
+    # the whole upload.
     try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+@router.post("/faqs/bulk")
+async def bulk_create_faqs(request: Request, db=Depends(get_db)):
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.split(";")[0].strip() in NDJSON_MEDIA_TYPES:
+            items = _iter_ndjson(request)
+        else:
+            items = _iter_json_array(request)
+
+        summary = await faq_service.bulk_create_faqs(items=items, db=db)
+
+        # 201 when every item was created, 207 when only some were, and
+        # 422 when none were; the results say which items failed and why.
+        if summary["created"] == 0:
+            status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+        elif summary["failed"]:
+            status_code = HTTPStatus.MULTI_STATUS
+        else:
+            status_code = HTTPStatus.CREATED
+
+        api_response = APIResponse(
+            success=summary["failed"] == 0 and summary["created"] > 0,
+            message=f"{summary['created']} FAQs created, {summary['failed']} failed.",  # noqa
+            data=summary,
+        )
+
+        return ORJSONResponse(
+            status_code=status_code, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/faqs/export")
+async def export_faqs(
+    lang: Optional[str] = None, after_id: Optional[int] = None
+):
+    try:
+        languages = (
+            _parse_languages(lang)
+            if lang is not None
+            else constants.SUPPORTED_LANGUAGES
+        )
+
+        return StreamingResponse(
+            faq_service.export_faqs(languages=languages, after_id=after_id),
+            media_type="application/x-ndjson",
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/faqs/search")
+async def search_faqs(
+    q: str,
+    lang: str = "en",
+    limit: int = constants.FAQS_SEARCH_DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    db=Depends(get_db),
+    read_db=Depends(get_read_db),
+):
+    try:
+        q = q.strip()
         if lang not in constants.SUPPORTED_LANGUAGES:
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
                 detail=f"Language '{lang}' is not supported.",
             )
-        cache_key = f"faqs:{lang}"
-        cached_faqs = await redis.get_redis_with_retry(cache_key)
+        if not 1 <= len(q) <= constants.FAQS_SEARCH_MAX_QUERY_LENGTH:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"q must be between 1 and {constants.FAQS_SEARCH_MAX_QUERY_LENGTH} characters.",  # noqa
+            )
+        if not 1 <= limit <= constants.FAQS_MAX_PAGE_SIZE:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"limit must be between 1 and {constants.FAQS_MAX_PAGE_SIZE}.",  # noqa
+            )
+        if not 0 <= offset <= constants.FAQS_SEARCH_MAX_OFFSET:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"offset must be between 0 and {constants.FAQS_SEARCH_MAX_OFFSET}.",  # noqa
+            )
 
-        if cached_faqs:
-            faqs = json.loads(cached_faqs)
-        else:
-            faqs = await faq_service.get_all_faqs_by_language(db=db, lang=lang)
-            await redis.set_redis_with_retry(
-                cache_key, json.dumps(faqs), expiration=3600
+        generation, faqs = await faq_cache.get_search_results(
+            lang, q, limit, offset
+        )
+        if faqs is None:
+            source = read_db if not faq_cache.recently_changed(lang) else db
+            faqs = await faq_service.search_faqs(
+                db=source, lang=lang, q=q, limit=limit, offset=offset
+            )
+            await source.close()
+            await faq_cache.set_search_results(
+                lang, q, limit, offset, generation, faqs
             )
 
         api_response = APIResponse(
@@ -77,9 +227,265 @@ async def get_faqs(lang: str = "en", db=Depends(get_db)):
             message="Faqs fetched successfully!",
             data={
                 "faqs": faqs,
+                "next_offset": offset + limit if len(faqs) == limit else None,  # noqa
+            },
+        )
+
+        return ORJSONResponse(
+            status_code=HTTPStatus.OK, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/faqs/suggest")
+async def suggest_faqs(
+    prefix: str,
+    lang: str = "en",
+    limit: int = constants.FAQS_SUGGEST_DEFAULT_LIMIT,
+):
+    try:
+        if lang not in constants.SUPPORTED_LANGUAGES:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"Language '{lang}' is not supported.",
+            )
+        if not prefix.strip():
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail="prefix must not be empty.",
+            )
+        if not 1 <= limit <= constants.FAQS_SUGGEST_MAX_LIMIT:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"limit must be between 1 and {constants.FAQS_SUGGEST_MAX_LIMIT}.",  # noqa
+            )
+
+        api_response = APIResponse(
+            success=True,
+            message="Suggestions fetched successfully!",
+            data={"suggestions": suggest_service.suggest(lang, prefix, limit)},
+        )
+
+        return ORJSONResponse(
+            status_code=HTTPStatus.OK, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/faqs/suggest/stats")
+async def get_suggest_stats():
+    try:
+        api_response = APIResponse(
+            success=True,
+            message="Suggest index stats fetched successfully!",
+            data=suggest_service.stats(),
+        )
+        return ORJSONResponse(
+            status_code=HTTPStatus.OK, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/faqs/")
+async def get_faqs(
+    background_tasks: BackgroundTasks,
+    lang: str = "en",
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db=Depends(get_db),
+    read_db=Depends(get_read_db),
+):
+    try:
+        languages = _parse_languages(lang)
+        max_limit = constants.FAQS_MAX_PAGE_SIZE
+        if limit is not None and not 1 <= limit <= max_limit:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f"limit must be between 1 and {max_limit}.",
+            )
+        if len(languages) > 1:
+            return await _get_faqs_many(
+                background_tasks,
+                languages,
+                limit,
+                cursor,
+                if_none_match,
+                db,
+                read_db,
+            )
+        lang = languages[0]
+
+        encoding = choose_encoding(accept_encoding)
+        cached = await faq_cache.get_response_body(
+            lang, cursor, limit, encoding
+        )
+        # The ETag follows from the generation, so a client that is up to
+        # date is answered before any body is read or built.
+        if cached.etag is not None and etag_matches(
+            if_none_match, cached.etag
+        ):
+            return not_modified(cached.etag)
+        if cached.body is not None:
+            return conditional_response(
+                cached.body,
+                cached.etag,
+                if_none_match,
+                encoding=cached.encoding,
+            )
+
+        generation, faqs = await faq_cache.get_faqs(lang, cursor, limit)
+
+        if faqs is None:
+            # Reads go to a replica unless the language has just changed.
+            source = read_db if not faq_cache.recently_changed(lang) else db
+            if limit is None:
+                generation, faqs = await faq_cache.load_faqs(lang, source)
+            else:
+                generation, faqs = await faq_cache.load_page(
+                    lang, cursor, limit, source
+                )
+                # Answer the page from its own index range scan and warm the
+                # language's cache after the response is sent, unless Redis
+                # is unavailable to store it.
+                if cached.generation is not None:
+                    background_tasks.add_task(faq_cache.rebuild, lang)
+            # Return the connection to the pool before the body is encoded,
+            # compressed and sent; the session closes only after that.
+            await source.close()
+
+        data = {"faqs": faqs}
+        if limit is not None:
+            data["next_cursor"] = (
+                faqs[-1]["id"] if len(faqs) == limit else None
+            )
+
+        api_response = APIResponse(
+            success=True,
+            message="Faqs fetched successfully!",
+            data=data,
+        )
+        body = orjson.dumps(api_response.model_dump())
+        cached = await faq_cache.set_response_body(
+            lang, cursor, limit, body, generation, cached
+        )
+        return conditional_response(
+            cached.body, cached.etag, if_none_match, encoding=cached.encoding
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+async def _get_faqs_many(
+    background_tasks: BackgroundTasks,
+    languages: list[str],
+    limit: Optional[int],
+    cursor: Optional[int],
+    if_none_match: Optional[str],
+    db,
+    read_db,
+):
+    # Every language is read from Redis in the same round-trip; only the
+    # languages whose cache is cold are loaded from Postgres.
+    cached = await faq_cache.get_faqs_many(languages, cursor, limit)
+    faqs_by_lang = {}
+    for lang, (_, faqs) in cached.items():
+        if faqs is not None:
+            faqs_by_lang[lang] = faqs
+            continue
+        source = read_db if not faq_cache.recently_changed(lang) else db
+        if limit is None:
+            _, faqs_by_lang[lang] = await faq_cache.load_faqs(lang, source)
+        else:
+            generation, faqs_by_lang[lang] = await faq_cache.load_page(
+                lang, cursor, limit, source
+            )
+            # As for a single language: no rebuild while Redis is down.
+            if generation is not None:
+                background_tasks.add_task(faq_cache.rebuild, lang)
+    await db.close()
+    await read_db.close()
+
+    data = {"faqs": faqs_by_lang}
+    if limit is not None:
+        data["next_cursor"] = {
+            lang: faqs[-1]["id"] if len(faqs) == limit else None
+            for lang, faqs in faqs_by_lang.items()
+        }
+
+    api_response = APIResponse(
+        success=True,
+        message="Faqs fetched successfully!",
+        data=data,
+    )
+    body = orjson.dumps(api_response.model_dump())
+    return conditional_response(body, make_etag(body), if_none_match)
+
+
+@router.get("/faqs/{faq_id}")
+async def get_faq(
+    faq_id: int,
+    lang: str = "en",
+    db=Depends(get_db),
+    read_db=Depends(get_read_db),
+):
+    try:
+        languages = _parse_languages(lang)
+
+        faqs, generations = await faq_cache.get_faq(faq_id, languages)
+        missing = [language for language in languages if language not in faqs]
+        if missing:
+            source = (
+                read_db if not faq_cache.recently_changed(*missing) else db
+            )
+            loaded = await faq_service.get_faq_translations(
+                db=source, faq_id=faq_id, langs=missing
+            )
+            await source.close()
+            await faq_cache.fill_faq(faq_id, loaded, generations)
+            faqs.update(loaded)
+
+        api_response = APIResponse(
+            success=True,
+            message="Faq fetched successfully!",
+            data={
+                "id": faq_id,
+                "translations": {
+                    language: {
+                        "question": faqs[language]["question"],
+                        "answer": faqs[language]["answer"],
+                    }
+                    for language in languages
+                    if language in faqs
+                },
             },
         )
-        return JSONResponse(
+        return ORJSONResponse(
+            status_code=HTTPStatus.OK, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/faqs/{faq_id}/translation-status")
+async def get_translation_status(faq_id: int, db=Depends(get_db)):
+    try:
+        status = await faq_service.get_translation_status(db=db, faq_id=faq_id)
+        api_response = APIResponse(
+            success=True,
+            message="Translation status fetched successfully!",
+            data=status,
+        )
+        return ORJSONResponse(
             status_code=HTTPStatus.OK, content=api_response.model_dump()
         )
     except Exception as e:
@@ -90,14 +496,14 @@ async def get_faqs(lang: str = "en", db=Depends(get_db)):
 @router.delete("/faqs/delete")
 async def delete_faq(faq_id: int, db=Depends(get_db)):
     try:
-        print(faq_id)
         await faq_service.delete_faq(db=db, faq_id=faq_id)
-        await redis.flush_all_keys()
+        await faq_cache.delete_faq(faq_id)
+        await suggest_service.remove(faq_id)
         api_response = APIResponse(
             success=True,
             message="Faq deleted successfully!",
         )
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=HTTPStatus.OK, content=api_response.model_dump()
         )
     except Exception as e:
@@ -0,0 +1,42 @@
+from http import HTTPStatus
+from fastapi import APIRouter
+from app.core.responses import ORJSONResponse
+from loguru import logger
+from app.schemas.response import APIResponse
+from app.services.translation_memory import translation_memory
+from app.services import translator as translator_service
+
+
+router = APIRouter()
+
+
+@router.get("/translations/memory/stats")
+async def get_translation_memory_stats():
+    try:
+        api_response = APIResponse(
+            success=True,
+            message="Translation memory stats fetched successfully!",
+            data=translation_memory.stats(),
+        )
+        return ORJSONResponse(
+            status_code=HTTPStatus.OK, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@router.get("/translations/backend/stats")
+async def get_translation_backend_stats():
+    try:
+        api_response = APIResponse(
+            success=True,
+            message="Translation backend stats fetched successfully!",
+            data=translator_service.batcher.stats(),
+        )
+        return ORJSONResponse(
+            status_code=HTTPStatus.OK, content=api_response.model_dump()
+        )
+    except Exception as e:
+        logger.error(e)
+        raise e
@@ -1,11 +1,31 @@
+from typing import Any, AsyncIterator
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import ReadSessionLocal
 from app.models.faq import FAQ as FAQModel
+from app.models.faq import FAQSnapshot as FAQSnapshotModel
+from app.models.faq import FAQTranslation as FAQTranslationModel
+from app.models.translation_job import (
+    JOB_DONE,
+    JOB_FAILED,
+    TranslationJob as TranslationJobModel,
+)
 from loguru import logger
-from app.services import translator as translator_service
 from app.schemas.faq import FAQ as FAQSchema
+from app.schemas.request import CreateFAQRequest
+from app.core import constants
 from bs4 import BeautifulSoup
 
 
+def parse_answer(answer: str) -> str:
+    soup = BeautifulSoup(answer, "html.parser")
+    return soup.get_text()
+
+
 async def create_faq(
     question: str,
     answer: str,
@@ -13,8 +33,7 @@ async def create_faq(
     db: AsyncSession,
 ):
     try:
-        soup = BeautifulSoup(answer, "html.parser")
-        parsed_answer = soup.get_text()
+        parsed_answer = parse_answer(answer)
 
         logger.info(parsed_answer)
 
@@ -23,15 +42,13 @@ async def create_faq(
             language=language,
             answer=answer,
             db=db,
+            translation_languages=constants.SUPPORTED_LANGUAGES,
         )
         faq_dto = FAQSchema(
             id=faq.id,
             answer=parsed_answer,
             question=faq.question,
         )
-        await translator_service.translate_text(
-            faq=faq_dto,
-        )
 
         return faq_dto
     except Exception as e:
@@ -39,9 +56,172 @@ async def create_faq(
         raise e
 
 
-async def get_all_faqs_by_language(db: AsyncSession, lang: str):
+async def bulk_create_faqs(items: AsyncIterator[Any], db: AsyncSession):
+    """Validate and insert FAQs from ``items`` in chunked transactions.
+
+    Invalid items are reported and skipped; every valid item is inserted
+    with its translation jobs. A chunk the database rejects is rolled back
+    and its items reported as failed, while chunks committed before it
+    stay committed and the upload carries on. Identical texts across the
+    batch are then translated once, since the worker claims consecutive
+    jobs together and the translator coalesces and memoizes duplicate
+    strings.
+    """
     try:
-        faqs = await FAQModel.get_translated_text(lang=lang, db=db)
+        results = []
+        chunk = []
+
+        async def flush():
+            try:
+                faq_ids = await FAQModel.bulk_create_faqs(
+                    faqs=[faq for _, faq in chunk],
+                    db=db,
+                    translation_languages=constants.SUPPORTED_LANGUAGES,
+                )
+            except SQLAlchemyError as e:
+                logger.error(f"Bulk insert of {len(chunk)} FAQs failed: {e}")
+                await db.rollback()
+                for index, _ in chunk:
+                    results.append({"index": index, "success": False, "error": "Could not be saved."})  # noqa
+            else:
+                for (index, _), faq_id in zip(chunk, faq_ids):
+                    results.append({"index": index, "success": True, "id": faq_id})  # noqa
+                logger.info(f"Bulk inserted {len(faq_ids)} FAQs")
+            chunk.clear()
+
+        index = 0
+        async for item in items:
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                request = CreateFAQRequest.model_validate(item)
+                if request.language not in constants.SUPPORTED_LANGUAGES:
+                    raise ValueError(
+                        f"Language '{request.language}' is not supported."
+                    )
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                )
+                results.append({"index": index, "success": False, "error": error})  # noqa
+            except ValueError as e:
+                results.append({"index": index, "success": False, "error": str(e)})  # noqa
+            else:
+                chunk.append((index, request.model_dump()))
+                if len(chunk) >= constants.FAQS_BULK_CHUNK_SIZE:
+                    await flush()
+            index += 1
+
+        if chunk:
+            await flush()
+
+        results.sort(key=lambda result: result["index"])
+        created = sum(1 for result in results if result["success"])
+        return {
+            "created": created,
+            "failed": len(results) - created,
+            "results": results,
+        }
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+async def export_faqs(
+    languages: list[str], after_id: int | None = None
+) -> AsyncIterator[bytes]:
+    """Yield every FAQ after ``after_id`` as one NDJSON line.
+
+    Uses its own session, since the response is still streaming after the
+    request's dependencies have been closed. It reads from a replica if
+    there are any: an export is a long scan, and resuming it with
+    ``after_id`` tolerates a few seconds of lag.
+    """
+    try:
+        async with ReadSessionLocal() as db:
+            async for faq in FAQModel.stream_with_translations(
+                db=db,
+                languages=languages,
+                after_id=after_id,
+                batch_size=constants.FAQS_EXPORT_BATCH_SIZE,
+            ):
+                yield orjson.dumps(faq) + b"\n"
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+async def search_faqs(
+    db: AsyncSession, lang: str, q: str, limit: int, offset: int = 0
+):
+    try:
+        faqs = await FAQTranslationModel.search(
+            lang=lang, text=q, db=db, limit=limit, offset=offset
+        )
+        logger.info(f"Found {len(faqs)} FAQs matching '{q}' in '{lang}'")
+        return faqs
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+async def get_faq_translations(
+    db: AsyncSession, faq_id: int, langs: list[str]
+) -> dict:
+    """Translations of one FAQ in ``langs``, with a single ``IN`` query."""
+    try:
+        rows = await FAQTranslationModel.get_translations(
+            faq_id=faq_id, languages=langs, db=db
+        )
+        if not rows and not await FAQModel.get_faq(faq_id=faq_id, db=db):
+            raise HTTPException(status_code=404, detail="FAQ not found")
+        return {row.pop("language"): row for row in rows}
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+async def get_translation_status(db: AsyncSession, faq_id: int):
+    try:
+        faq = await FAQModel.get_faq(faq_id=faq_id, db=db)
+        if not faq:
+            raise HTTPException(status_code=404, detail="FAQ not found")
+
+        jobs = await TranslationJobModel.get_status_for_faq(
+            faq_id=faq_id, db=db
+        )
+        done = sum(1 for job in jobs if job["status"] == JOB_DONE)
+        failed = sum(1 for job in jobs if job["status"] == JOB_FAILED)
+        return {
+            "faq_id": faq_id,
+            "total": len(jobs),
+            "done": done,
+            "failed": failed,
+            "complete": done + failed == len(jobs),
+            "languages": jobs,
+        }
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+async def get_all_faqs_by_language(
+    db: AsyncSession,
+    lang: str,
+    limit: int | None = None,
+    cursor: int | None = None,
+):
+    try:
+        if limit is None and cursor is None:
+            # The full list is one row of faq_snapshots; languages without
+            # a snapshot yet are assembled from faq_translations.
+            faqs = await FAQSnapshotModel.get_faqs(lang=lang, db=db)
+            if faqs is not None:
+                return faqs
+        faqs = await FAQModel.get_translated_text(
+            lang=lang, db=db, limit=limit, after_id=cursor
+        )
         return faqs
     except Exception as e:
         logger.error(e)
@@ -0,0 +1,499 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import NamedTuple, Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import constants, redis
+from app.core.config import settings
+from app.core.responses import compress, make_etag
+from app.core.singleflight import SingleFlight
+from app.database.session import AsyncSessionLocal, ReadSessionLocal
+from app.services import faq as faq_service
+
+FAQS_CACHE_NAMESPACE = "faqs"
+# A language's cache is fresh for FAQS_CACHE_SOFT_TTL seconds; it is
+# refreshed in the background once FAQS_CACHE_REFRESH_AHEAD of that has
+# passed, and stale entries keep being served for up to
+# FAQS_CACHE_STALE_TTL more seconds while the refresh runs.
+FAQS_CACHE_SOFT_TTL = 3600
+FAQS_CACHE_REFRESH_AHEAD = 0.8
+FAQS_CACHE_STALE_TTL = 3600
+FAQS_CACHE_EXPIRATION = FAQS_CACHE_SOFT_TTL + FAQS_CACHE_STALE_TTL
+# Serialized responses are cheap to rebuild from the hash, and expiring them
+# sooner lets the hash's refresh-ahead check run regularly.
+FAQS_BODY_CACHE_EXPIRATION = 300
+# Search results are cached per generation, so writes invalidate them; the
+# short TTL just keeps one-off queries from piling up in Redis.
+FAQS_SEARCH_CACHE_EXPIRATION = 60
+FAQS_REBUILD_LOCK_TIMEOUT = 10.0
+FAQS_REBUILD_POLL_INTERVAL = 0.05
+
+# Each language's FAQs live in a Redis hash (faq_id -> JSON entry) with a
+# sorted set of faq_ids next to it for keyset pages, so creates and deletes
+# are O(1) HSET/HDEL updates instead of rewriting a JSON blob of the whole
+# corpus. Every change also bumps the language's generation, which doubles
+# as its content version. Complete serialized responses are cached per
+# generation on top of that, and both deserialized lists and response bytes
+# are kept in the in-process L1 cache, invalidated over Redis pub/sub.
+
+# Cache misses are coalesced per key within the process, and full rebuilds
+# additionally take a short Redis lock so only one worker across the fleet
+# queries Postgres while the rest wait for its result.
+_single_flight = SingleFlight()
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def _namespace(lang: str) -> str:
+    return f"{FAQS_CACHE_NAMESPACE}:{lang}"
+
+
+def _entries_key(lang: str) -> str:
+    return f"{FAQS_CACHE_NAMESPACE}:{lang}:entries"
+
+
+def _index_key(lang: str) -> str:
+    return f"{FAQS_CACHE_NAMESPACE}:{lang}:ids"
+
+
+async def get_generation(lang: str) -> Optional[int]:
+    return await redis.get_generation(_namespace(lang))
+
+
+def recently_changed(*langs: str) -> bool:
+    """Whether any of the languages changed recently enough that a read
+    replica may not have the change yet; such reads go to the primary,
+    so a lagging replica is never cached under the new generation."""
+    return any(
+        redis.local_cache.invalidated_within(
+            _namespace(lang), settings.DATABASE_REPLICA_MAX_LAG
+        )
+        for lang in langs
+    )
+
+
+def _bodies_key(lang: str) -> str:
+    return f"{FAQS_CACHE_NAMESPACE}:{lang}:bodies"
+
+
+def _body_field(cursor: int | None, limit: int | None, encoding: str) -> str:
+    if limit is None:
+        return f"all:{encoding}"
+    return f"page:{cursor or 0}:{limit}:{encoding}"
+
+
+def _etag(lang: str, generation: Optional[int], field: str) -> Optional[str]:
+    # A response is fully determined by the language's generation and the
+    # field, so its ETag is derived from them instead of hashing the body.
+    # Generation 0 only means nothing changed since Redis lost its data, so
+    # it could repeat with different content; those bodies are hashed.
+    if not generation:
+        return None
+    return f'"{redis.versioned_key(_namespace(lang), generation, field)}"'
+
+
+class CachedBody(NamedTuple):
+    generation: Optional[int]
+    epoch: int
+    body: Optional[bytes]
+    etag: Optional[str]
+    encoding: str
+
+
+def _local_key(lang: str, cursor: int | None, limit: int | None) -> str:
+    if limit is None:
+        return _namespace(lang)
+    return f"{_namespace(lang)}:page:{cursor or 0}:{limit}"
+
+
+async def get_faqs(
+    lang: str, cursor: int | None = None, limit: int | None = None
+) -> tuple[Optional[int], Optional[list]]:
+    """Cached FAQs of a language (or one keyset page of them) and the
+    generation they were read at; the FAQs are None if the language's cache
+    has not been built."""
+    return (await get_faqs_many([lang], cursor, limit))[lang]
+
+
+async def get_faqs_many(
+    langs: list[str], cursor: int | None = None, limit: int | None = None
+) -> dict[str, tuple[Optional[int], Optional[list]]]:
+    """get_faqs for several languages, reading all of those missing from the
+    L1 cache from Redis together."""
+    faqs_by_lang = {}
+    epochs = {}
+    for lang in langs:
+        faqs_by_lang[lang] = redis.local_cache.get(
+            _local_key(lang, cursor, limit)
+        ) or (None, None)
+        if faqs_by_lang[lang][1] is None:
+            epochs[lang] = redis.local_cache.epoch(_namespace(lang))
+    if not epochs:
+        return faqs_by_lang
+
+    if limit is None:
+        cached = await redis.get_indexed_hashes(
+            [(_namespace(lang), _entries_key(lang)) for lang in epochs]
+        )
+    else:
+        cached = await redis.get_indexed_hash_pages(
+            [
+                (_namespace(lang), _entries_key(lang), _index_key(lang))
+                for lang in epochs
+            ],
+            cursor or 0,
+            limit,
+        )
+
+    for (lang, epoch), result in zip(epochs.items(), cached):
+        if result is None:
+            continue
+        if limit is None:
+            entries, built_at, generation = result
+            faqs = [
+                json.loads(entries[faq_id])
+                for faq_id in sorted(entries, key=int)
+            ]
+        else:
+            values, built_at, generation = result
+            faqs = [json.loads(value) for value in values]
+
+        if time.time() - built_at >= FAQS_CACHE_SOFT_TTL * FAQS_CACHE_REFRESH_AHEAD:  # noqa
+            _schedule_refresh(lang)
+
+        redis.local_cache.set(
+            _local_key(lang, cursor, limit),
+            (generation, faqs),
+            _namespace(lang),
+            epoch,
+        )
+        faqs_by_lang[lang] = (generation, faqs)
+    return faqs_by_lang
+
+
+async def get_faq(
+    faq_id: int, langs: list[str]
+) -> tuple[dict[str, dict], dict[str, int]]:
+    """Cached translations of one FAQ, and the generations they were read
+    at (empty if Redis is unavailable) for fill_faq."""
+    fields = await redis.get_hash_fields(
+        [(_namespace(lang), _entries_key(lang)) for lang in langs],
+        str(faq_id),
+    )
+    if fields is None:
+        return {}, {}
+    faqs = {
+        lang: json.loads(value)
+        for lang, (_, value) in zip(langs, fields)
+        if value is not None
+    }
+    return faqs, {lang: generation for lang, (generation, _) in zip(langs, fields)}  # noqa
+
+
+async def fill_faq(
+    faq_id: int, faqs: dict[str, dict], generations: dict[str, int]
+) -> bool:
+    """Cache translations of one FAQ read from the database after get_faq
+    missed them."""
+    fills = [
+        (
+            _namespace(lang),
+            _entries_key(lang),
+            _index_key(lang),
+            {faq_id: json.dumps(faq)},
+            generations[lang],
+        )
+        for lang, faq in faqs.items()
+        if lang in generations
+    ]
+    if not fills:
+        return False
+    return await redis.fill_indexed_hashes(
+        fills, expiration=FAQS_CACHE_EXPIRATION
+    )
+
+
+async def get_response_body(
+    lang: str,
+    cursor: int | None = None,
+    limit: int | None = None,
+    encoding: str = "identity",
+) -> CachedBody:
+    """Serialized ``GET /faqs/`` response for the language's current content,
+    in the requested content-coding where one was worth storing.
+
+    ``body`` is None on a miss; pass the result back to ``set_response_body``
+    so the response is cached against the generation it was built from.
+    ``etag`` is set even on a miss whenever it can be derived from the
+    generation, so conditional requests can be answered without a body.
+    """
+    field = _body_field(cursor, limit, encoding)
+    local_key = f"{_namespace(lang)}:body:{field}"
+    epoch = redis.local_cache.epoch(_namespace(lang))
+    cached = redis.local_cache.get(local_key)
+    if cached is not None:
+        return CachedBody(cached[0], epoch, *cached[1:])
+
+    generation, value = await redis.get_versioned_field(
+        _namespace(lang), _bodies_key(lang), field
+    )
+    etag = _etag(lang, generation, field)
+    if value is None:
+        return CachedBody(generation, epoch, None, etag, encoding)
+
+    body_encoding, _, body = value.partition(b":")
+    cached = (
+        generation,
+        body,
+        etag or make_etag(body),
+        body_encoding.decode(),
+    )
+    redis.local_cache.set(local_key, cached, _namespace(lang), epoch)
+    return CachedBody(cached[0], epoch, *cached[1:])
+
+
+async def set_response_body(
+    lang: str,
+    cursor: int | None,
+    limit: int | None,
+    body: bytes,
+    generation: Optional[int],
+    cached: CachedBody,
+) -> CachedBody:
+    """Compress ``body``, built from FAQs read at ``generation``, for the
+    encoding ``cached`` was looked up with, cache it and return it. Other
+    encodings are compressed and cached when they are first asked for.
+
+    Nothing is cached unless ``generation`` is the one ``cached`` was
+    looked up at: the FAQs may come from an L1 entry that this worker has
+    not yet heard is out of date, and a body stamped with a newer
+    generation would be served by every worker.
+    """
+    cacheable = (
+        cached.generation is not None and generation == cached.generation
+    )
+    # Small bodies are not compressed; serve them as-is to every client.
+    body_encoding, variant = await compress(body, cached.encoding)
+    field = _body_field(cursor, limit, cached.encoding)
+    # A body built at another generation must not claim this one's ETag.
+    etag = _etag(lang, cached.generation, field) if cacheable else None
+    response = CachedBody(
+        cached.generation,
+        cached.epoch,
+        variant,
+        etag or make_etag(variant),
+        body_encoding,
+    )
+    if cacheable:
+        redis.local_cache.set(
+            f"{_namespace(lang)}:body:{field}",
+            (
+                response.generation,
+                response.body,
+                response.etag,
+                response.encoding,
+            ),
+            _namespace(lang),
+            cached.epoch,
+        )
+        await redis.set_versioned_fields(
+            _bodies_key(lang),
+            {field: b"%b:%b" % (body_encoding.encode(), variant)},
+            generation=cached.generation,
+            expiration=FAQS_BODY_CACHE_EXPIRATION,
+        )
+    return response
+
+
+def _search_key(
+    lang: str, generation: int, q: str, limit: int, offset: int
+) -> str:
+    digest = hashlib.sha256(q.encode()).hexdigest()
+    return redis.versioned_key(
+        f"search:{lang}", generation, digest, limit, offset
+    )
+
+
+async def get_search_results(
+    lang: str, q: str, limit: int, offset: int
+) -> tuple[Optional[int], Optional[list]]:
+    """Cached results of a search and the generation they belong to."""
+    generation = await get_generation(lang)
+    if generation is None:
+        return None, None
+    cached = await redis.get_redis_with_retry(
+        _search_key(lang, generation, q, limit, offset)
+    )
+    return generation, (json.loads(cached) if cached is not None else None)
+
+
+async def set_search_results(
+    lang: str,
+    q: str,
+    limit: int,
+    offset: int,
+    generation: Optional[int],
+    faqs: list,
+) -> bool:
+    if generation is None:
+        return False
+    return await redis.set_redis_with_retry(
+        _search_key(lang, generation, q, limit, offset),
+        json.dumps(faqs),
+        FAQS_SEARCH_CACHE_EXPIRATION,
+    )
+
+
+async def store_faqs(lang: str, faqs: list, generation: Optional[int]) -> bool:
+    """Rebuild a language's cache from a full list read at ``generation``."""
+    if generation is None:
+        return False
+    stored = await redis.replace_indexed_hash(
+        _entries_key(lang),
+        _index_key(lang),
+        {faq["id"]: json.dumps(faq) for faq in faqs},
+        namespace=_namespace(lang),
+        expected_generation=generation,
+        expiration=FAQS_CACHE_EXPIRATION,
+    )
+    # The rebuild only succeeds if nothing changed since ``generation`` was
+    # read, in which case the list is also current enough for the L1 cache.
+    if stored:
+        redis.local_cache.set(
+            _local_key(lang, None, None),
+            (generation, faqs),
+            _namespace(lang),
+            redis.local_cache.epoch(_namespace(lang)),
+        )
+    return stored
+
+
+async def load_faqs(
+    lang: str, db: AsyncSession
+) -> tuple[Optional[int], list]:
+    """Full list of a language's FAQs after a cache miss, and the generation
+    it is at least as new as (None if Redis is unavailable)."""
+    return await _single_flight.do(
+        _namespace(lang), lambda: _load_language(lang, db)
+    )
+
+
+async def load_page(
+    lang: str, cursor: int | None, limit: int, db: AsyncSession
+) -> tuple[Optional[int], list]:
+    """One keyset page after a cache miss, read with its own range scan;
+    stamped like load_faqs."""
+    return await _single_flight.do(
+        _local_key(lang, cursor, limit),
+        lambda: _load_page(lang, cursor, limit, db),
+    )
+
+
+async def rebuild(lang: str):
+    if _single_flight.in_flight(_namespace(lang)):
+        return
+    # Without Redis the rebuilt list could not be stored, so don't query
+    # the whole language for nothing.
+    if await get_generation(lang) is None:
+        return
+    try:
+        session = (
+            AsyncSessionLocal if recently_changed(lang) else ReadSessionLocal
+        )
+        async with session() as db:
+            await load_faqs(lang, db)
+    except Exception as e:
+        logger.error(f"Failed to rebuild FAQ cache for '{lang}': {e}")
+
+
+async def set_faq(lang: str, faq: dict) -> bool:
+    return await redis.update_indexed_hashes(
+        [(_entries_key(lang), _index_key(lang), {faq["id"]: json.dumps(faq)}, [])],  # noqa
+        namespaces=[_namespace(lang)],
+        expiration=FAQS_CACHE_EXPIRATION,
+    )
+
+
+async def delete_faq(faq_id: int) -> bool:
+    # A FAQ is translated into every supported language, so it is removed
+    # from every language's cache (and only from there).
+    langs = constants.SUPPORTED_LANGUAGES
+    return await redis.update_indexed_hashes(
+        [
+            (_entries_key(lang), _index_key(lang), {}, [faq_id])
+            for lang in langs
+        ],
+        namespaces=[_namespace(lang) for lang in langs],
+        expiration=FAQS_CACHE_EXPIRATION,
+    )
+
+
+async def invalidate_language(*langs: str) -> bool:
+    return await redis.bump_generation(*(_namespace(lang) for lang in langs))
+
+
+#  private methods
+
+
+async def _load_language(
+    lang: str, db: AsyncSession
+) -> tuple[Optional[int], list]:
+    lock_key = f"lock:{_namespace(lang)}"
+    token = await redis.acquire_lock(lock_key, FAQS_REBUILD_LOCK_TIMEOUT)
+    if token is None:
+        loaded, token = await _wait_for_rebuild(lang, lock_key)
+        if loaded is not None:
+            return loaded
+
+    try:
+        generation = await get_generation(lang)
+        faqs = await faq_service.get_all_faqs_by_language(db=db, lang=lang)
+        await store_faqs(lang, faqs, generation)
+        return generation, faqs
+    finally:
+        if token is not None:
+            await redis.release_lock(lock_key, token)
+
+
+async def _load_page(
+    lang: str, cursor: int | None, limit: int, db: AsyncSession
+) -> tuple[Optional[int], list]:
+    generation = await get_generation(lang)
+    faqs = await faq_service.get_all_faqs_by_language(
+        db=db, lang=lang, limit=limit, cursor=cursor
+    )
+    return generation, faqs
+
+
+def _schedule_refresh(lang: str):
+    # Serve what is cached now and rebuild it off the request path; rebuild
+    # is a no-op if a load for this language is already in flight.
+    if _single_flight.in_flight(_namespace(lang)):
+        return
+    task = asyncio.create_task(rebuild(lang))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _wait_for_rebuild(
+    lang: str, lock_key: str
+) -> tuple[Optional[tuple[int, list]], Optional[str]]:
+    # Another worker holds the rebuild lock; wait for it to publish the
+    # rebuilt cache rather than querying Postgres as well. Its write is
+    # skipped if the language changed during its query, so once the lock
+    # is free again the next waiter takes it over and queries instead; the
+    # rest keep waiting. Returns the FAQs and their generation, or the
+    # lock's token if taken.
+    deadline = time.monotonic() + FAQS_REBUILD_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(FAQS_REBUILD_POLL_INTERVAL)
+        generation, faqs = await get_faqs(lang)
+        if faqs is not None:
+            return (generation, faqs), None
+        token = await redis.acquire_lock(lock_key, FAQS_REBUILD_LOCK_TIMEOUT)
+        if token is not None:
+            return None, token
+    return None, None
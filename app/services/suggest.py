@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Optional
+
+from loguru import logger
+
+from app.core import constants, redis
+from app.core.config import settings
+from app.core.prefix_index import PrefixIndex
+from app.database.session import AsyncSessionLocal
+from app.models.faq import FAQTranslation as FAQTranslationModel
+
+SUGGEST_CHANNEL = "suggest:update"
+
+# Updates received while a rebuild is reading the table, replayed onto the
+# new indexes before they replace the old ones.
+_pending: Optional[list[dict]] = None
+_rebuild_task: Optional[asyncio.Task] = None
+
+
+def _new_indexes() -> dict[str, PrefixIndex]:
+    return {
+        lang: PrefixIndex(
+            max_entries=settings.SUGGEST_INDEX_MAX_ENTRIES,
+            max_length=settings.SUGGEST_INDEX_MAX_LENGTH,
+        )
+        for lang in constants.SUPPORTED_LANGUAGES
+    }
+
+
+# Each process keeps its own prefix index of translated questions per
+# language. Changes are applied locally and published on SUGGEST_CHANNEL
+# so the other processes apply them too, and the indexes are rebuilt from
+# faq_translations whenever the subscription drops and messages may have
+# been missed.
+_indexes: dict[str, PrefixIndex] = _new_indexes()
+
+
+def register():
+    """Subscribe to updates; call before the invalidation listener starts."""
+    redis.add_channel_handler(SUGGEST_CHANNEL, _on_message, _schedule_rebuild)
+
+
+async def stop():
+    if _rebuild_task is not None:
+        _rebuild_task.cancel()
+        await asyncio.gather(_rebuild_task, return_exceptions=True)
+
+
+def suggest(lang: str, prefix: str, limit: int) -> list[dict]:
+    return _indexes[lang].search(prefix, limit)
+
+
+def stats() -> dict:
+    languages = {lang: index.stats() for lang, index in _indexes.items()}
+    return {
+        "entries": sum(stat["entries"] for stat in languages.values()),
+        "approx_bytes": sum(stat["approx_bytes"] for stat in languages.values()),  # noqa
+        "languages": languages,
+    }
+
+
+async def add(lang: str, faq_id: int, question: str):
+    await _update({"lang": lang, "id": faq_id, "question": question})
+
+
+async def remove(faq_id: int):
+    await _update({"lang": None, "id": faq_id, "question": None})
+
+
+async def build():
+    global _indexes, _pending
+    started = time.perf_counter()
+    _pending = []
+    try:
+        indexes = _new_indexes()
+        questions = defaultdict(list)
+        async with AsyncSessionLocal() as db:
+            async for row in FAQTranslationModel.stream_questions(db=db):
+                questions[row["language"]].append(
+                    (row["id"], row["question"])
+                )
+        # Loaded a language at a time, so each index is sorted only once.
+        for lang, index in indexes.items():
+            index.add_many(questions.pop(lang, []))
+            await asyncio.sleep(0)
+        for update in _pending:
+            _apply(indexes, update)
+        _indexes = indexes
+        logger.info(
+            f"Built suggest index with {stats()['entries']} entries in "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+    except Exception as e:
+        logger.error(f"Failed to build suggest index: {e}")
+    finally:
+        _pending = None
+
+
+async def _update(update: dict):
+    _on_update(update)
+    await redis.publish(SUGGEST_CHANNEL, json.dumps(update))
+
+
+def _on_message(data: str):
+    # A process also receives its own updates; applying one twice is a
+    # no-op.
+    _on_update(json.loads(data))
+
+
+def _on_update(update: dict):
+    if _pending is not None:
+        _pending.append(update)
+    _apply(_indexes, update)
+
+
+def _apply(indexes: dict[str, PrefixIndex], update: dict):
+    if update["question"] is None:
+        for index in indexes.values():
+            index.remove(update["id"])
+    elif update["lang"] in indexes:
+        indexes[update["lang"]].add(update["id"], update["question"])
+
+
+def _schedule_rebuild():
+    global _rebuild_task
+    if _rebuild_task is None or _rebuild_task.done():
+        _rebuild_task = asyncio.create_task(build())
@@ -0,0 +1,85 @@
+import asyncio
+import inspect
+from abc import ABC, abstractmethod
+
+from googletrans import Translator
+
+
+class TranslationBackend(ABC):
+    """Translates a batch of (text, target language) pairs in as few calls
+    to the underlying service as it allows."""
+
+    name: str
+
+    @abstractmethod
+    async def translate_batch(
+        self, items: list[tuple[str, str]], src: str = "auto"
+    ) -> list[str]:
+        """Return the translations in the same order as ``items``."""
+
+    def requests_for(self, items: list[tuple[str, str]]) -> int:
+        """Requests to the underlying service a batch costs, for rate
+        limiting."""
+        return 1
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    name = "google"
+
+    def __init__(self):
+        self._translator = Translator()
+
+    def requests_for(self, items: list[tuple[str, str]]) -> int:
+        return len(items)
+
+    async def translate_batch(
+        self, items: list[tuple[str, str]], src: str = "auto"
+    ) -> list[str]:
+        # googletrans translates one text per request, so a batch costs one
+        # request per item; they are sent concurrently.
+        results = await asyncio.gather(
+            *(self._translate(text, dest, src) for text, dest in items)
+        )
+        return [result.text for result in results]
+
+    async def _translate(self, text: str, dest: str, src: str):
+        # Older googletrans releases are synchronous, newer ones async;
+        # run the synchronous client off the event loop.
+        if inspect.iscoroutinefunction(self._translator.translate):
+            return await self._translator.translate(text, dest=dest, src=src)
+        return await asyncio.to_thread(
+            self._translator.translate, text, dest=dest, src=src
+        )
+
+
+class FakeTranslationBackend(TranslationBackend):
+    """Deterministic in-process backend for tests and offline benchmarks."""
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.items = 0
+
+    async def translate_batch(
+        self, items: list[tuple[str, str]], src: str = "auto"
+    ) -> list[str]:
+        self.calls += 1
+        self.items += len(items)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [f"[{dest}] {text}" for text, dest in items]
+
+
+TRANSLATION_BACKENDS = {
+    GoogleTranslateBackend.name: GoogleTranslateBackend,
+    FakeTranslationBackend.name: FakeTranslationBackend,
+}
+
+
+def get_translation_backend(name: str) -> TranslationBackend:
+    try:
+        return TRANSLATION_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown translation backend '{name}'.")
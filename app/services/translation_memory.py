@@ -0,0 +1,88 @@
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+from app.core import redis
+from app.core.config import settings
+
+TRANSLATION_MEMORY_KEY_PREFIX = "tm"
+
+
+class TranslationMemory:
+    """Content-addressed cache of translations.
+
+    Entries are keyed by a hash of (source text, source language, target
+    language) and looked up in an in-process LRU first, then in Redis, so
+    repeated questions and boilerplate answers are translated only once.
+    """
+
+    def __init__(self, max_entries: int, expiration: int):
+        self.max_entries = max_entries
+        self.expiration = expiration
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.backend_seconds = 0.0
+
+    @staticmethod
+    def make_key(text: str, src: str, dest: str) -> str:
+        digest = hashlib.sha256(
+            f"{src}\x00{dest}\x00{text}".encode("utf-8")
+        ).hexdigest()
+        return f"{TRANSLATION_MEMORY_KEY_PREFIX}:{digest}"
+
+    async def get(self, text: str, src: str, dest: str) -> Optional[str]:
+        key = self.make_key(text, src, dest)
+
+        translated = self._entries.get(key)
+        if translated is not None:
+            self._entries.move_to_end(key)
+            self.local_hits += 1
+            return translated
+
+        translated = await redis.get_redis_with_retry(key)
+        if translated is not None:
+            self._remember(key, translated)
+            self.redis_hits += 1
+            return translated
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, src: str, dest: str, translated: str):
+        key = self.make_key(text, src, dest)
+        self._remember(key, translated)
+        await redis.set_redis_with_retry(
+            key, translated, expiration=self.expiration
+        )
+
+    def record_backend_call(self, seconds: float):
+        self.backend_seconds += seconds
+
+    def stats(self) -> dict:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        average_call = self.backend_seconds / self.misses if self.misses else 0.0  # noqa
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "local_entries": len(self._entries),
+            "max_local_entries": self.max_entries,
+            "backend_seconds": round(self.backend_seconds, 3),
+            "estimated_seconds_saved": round(hits * average_call, 3),
+        }
+
+    def _remember(self, key: str, translated: str):
+        self._entries[key] = translated
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+translation_memory = TranslationMemory(
+    max_entries=settings.TRANSLATION_MEMORY_MAX_ENTRIES,
+    expiration=settings.TRANSLATION_MEMORY_EXPIRATION,
+)
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+from loguru import logger
+
+from app.core import metrics
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal
+from app.models.faq import FAQ as FAQModel
+from app.models.faq import FAQSnapshot as FAQSnapshotModel
+from app.models.faq import FAQTranslation as FAQTranslationModel
+from app.models.translation_job import (
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    TranslationJob as TranslationJobModel,
+)
+from app.schemas.faq import FAQ as FAQSchema
+from app.services import faq_cache
+from app.services import suggest as suggest_service
+from app.services import translator as translator_service
+from app.services.faq import parse_answer
+
+TRANSLATION_RETRY_MAX_DELAY = 300
+
+_workers: list[asyncio.Task] = []
+_queue_depth_counted_at: float | None = None
+
+
+async def start_workers():
+    for worker_id in range(settings.TRANSLATION_WORKERS):
+        _workers.append(asyncio.create_task(_run_worker(worker_id)))
+    logger.info(f"Started {len(_workers)} translation workers")
+
+
+async def stop_workers():
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def record_queue_depth():
+    """Refresh the queue depth gauge; called when metrics are scraped.
+
+    The count is a query over the jobs table, so scrapes within
+    TRANSLATION_QUEUE_DEPTH_TTL of the last one reuse its values.
+    """
+    global _queue_depth_counted_at
+    now = time.monotonic()
+    ttl = settings.TRANSLATION_QUEUE_DEPTH_TTL
+    if (
+        _queue_depth_counted_at is not None
+        and now - _queue_depth_counted_at < ttl
+    ):
+        return
+    _queue_depth_counted_at = now
+    try:
+        async with AsyncSessionLocal() as db:
+            counts = await TranslationJobModel.count_by_status(
+                statuses=[JOB_PENDING, JOB_RUNNING, JOB_FAILED], db=db
+            )
+        for status, count in counts.items():
+            metrics.TRANSLATION_QUEUE_JOBS.labels(status).set(count)
+    except Exception as e:
+        logger.error(f"Failed to count translation jobs: {e}")
+
+
+#  private methods
+
+
+async def _run_worker(worker_id: int):
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                jobs = await TranslationJobModel.claim(
+                    db=db,
+                    batch_size=settings.TRANSLATION_JOB_BATCH_SIZE,
+                    lease_seconds=settings.TRANSLATION_JOB_LEASE_SECONDS,
+                )
+            if not jobs:
+                await asyncio.sleep(settings.TRANSLATION_POLL_INTERVAL)
+                continue
+
+            await asyncio.gather(*(_process_job(job) for job in jobs))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Translation worker {worker_id} failed: {e}")
+            await asyncio.sleep(settings.TRANSLATION_POLL_INTERVAL)
+
+
+async def _process_job(job: dict):
+    try:
+        async with AsyncSessionLocal() as db:
+            faq = await FAQModel.get_faq(faq_id=job["faq_id"], db=db)
+            if not faq:
+                # The FAQ was deleted; its jobs are removed by the cascade.
+                return
+
+            translated_question, translated_answer = (
+                await translator_service.translate_text(
+                    faq=FAQSchema(
+                        id=faq.id,
+                        question=faq.question,
+                        answer=parse_answer(faq.answer),
+                    ),
+                    lang=job["language"],
+                    src=faq.language or "auto",
+                )
+            )
+            await FAQTranslationModel.replace_faq_translation(
+                db=db,
+                faq_id=job["faq_id"],
+                translated_question=translated_question,
+                translated_answer=translated_answer,
+                lang=job["language"],
+            )
+            await FAQSnapshotModel.set_entry(
+                lang=job["language"],
+                faq_id=job["faq_id"],
+                question=translated_question,
+                answer=translated_answer,
+                db=db,
+            )
+            await TranslationJobModel.mark_done(job_id=job["id"], db=db)
+            await db.commit()
+
+        await faq_cache.set_faq(
+            job["language"],
+            {
+                "id": job["faq_id"],
+                "question": translated_question,
+                "answer": translated_answer,
+            },
+        )
+        await suggest_service.add(
+            job["language"], job["faq_id"], translated_question
+        )
+        # A delete that committed after this job may already have cleared
+        # the caches, and the writes above would have put the FAQ back;
+        # check again now that they are done and clear it once more.
+        async with AsyncSessionLocal() as db:
+            deleted = not await FAQModel.get_faq(faq_id=job["faq_id"], db=db)
+        if deleted:
+            await faq_cache.delete_faq(job["faq_id"])
+            await suggest_service.remove(job["faq_id"])
+    except Exception as e:
+        logger.error(
+            f"Translation job {job['id']} ({job['language']}) failed: {e}"
+        )
+        if job["attempts"] >= settings.TRANSLATION_JOB_MAX_ATTEMPTS:
+            retry_in = None
+        else:
+            retry_in = min(2 ** job["attempts"], TRANSLATION_RETRY_MAX_DELAY)
+
+        async with AsyncSessionLocal() as db:
+            await TranslationJobModel.mark_failed(
+                job_id=job["id"], error=str(e), retry_in=retry_in, db=db
+            )
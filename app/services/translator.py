@@ -1,45 +1,251 @@
-from googletrans import Translator
-from app.database.session import AsyncSessionLocal
+import asyncio
+import contextlib
+import time
+from collections import defaultdict
+from typing import Optional
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.rate_limit import AdaptiveConcurrencyLimit, TokenBucket
 from app.schemas.faq import FAQ as FAQSchema
+from app.services.translation_backends import (
+    TranslationBackend,
+    get_translation_backend,
+)
+from app.services.translation_memory import translation_memory
 from loguru import logger
-from app.models.faq import FAQTranslation as FAQTranslationModels
-from app.core import constants
-import asyncio
 
-translator = Translator()
 
+class TranslationBatcher:
+    """Coalesces concurrent translation requests into batched backend calls.
 
-async def translate_text(faq: FAQSchema):
-    try:
-        translations = []
+    Requests arriving within ``max_delay`` seconds of each other (or until
+    ``max_batch_size`` is reached) are deduplicated and sent together, so a
+    FAQ's question and answer in every language, plus any other FAQs being
+    translated at the same time, share a single backend round-trip.
 
-        async def translate_and_store(lang):
-            translated_question = await translator.translate(
-                text=faq.question,
-                dest=lang,
-            )
-            translated_answer = await translator.translate(
-                text=faq.answer,
-                dest=lang,
+    Backend calls optionally go through a ``rate_limit`` and a
+    ``concurrency`` limit, so bursts queue here instead of getting throttled
+    by the service.
+    """
+
+    def __init__(
+        self,
+        backend: TranslationBackend,
+        max_batch_size: int,
+        max_delay: float,
+        rate_limit: Optional[TokenBucket] = None,
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+    ):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.rate_limit = rate_limit
+        self.concurrency = concurrency
+        self.backend_calls = 0
+        self.items_requested = 0
+        self.items_translated = 0
+        self._pending: list[tuple[str, str, str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def translate(self, text: str, src: str, dest: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, src, dest, future))
+        self.items_requested += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay, self._flush
             )
-            translations.append(
-                FAQTranslationModels(
-                    faq_id=faq.id,
-                    translated_question=translated_question.text,
-                    translated_answer=translated_answer.text,
-                    language=lang,
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "backend_calls": self.backend_calls,
+            "items_requested": self.items_requested,
+            "items_translated": self.items_translated,
+            "rate_limit_wait_seconds": round(self.rate_limit.waited, 3)
+            if self.rate_limit is not None
+            else 0.0,
+            "concurrency": self.concurrency.stats()
+            if self.concurrency is not None
+            else None,
+        }
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, str, str, asyncio.Future]]):
+        futures_by_src = defaultdict(lambda: defaultdict(list))
+        for text, src, dest, future in batch:
+            futures_by_src[src][(text, dest)].append(future)
+
+        for src, futures_by_item in futures_by_src.items():
+            await self._send(src, futures_by_item)
+
+    async def _send(self, src: str, futures_by_item: dict):
+        items = list(futures_by_item)
+        try:
+            translations = await self._call_backend(items, src)
+        except Exception as e:
+            dests = {dest for _, dest in items}
+            if len(dests) > 1:
+                # Retry each language on its own, so one language failing
+                # doesn't fail the others.
+                await asyncio.gather(
+                    *(
+                        self._send(
+                            src,
+                            {
+                                item: futures
+                                for item, futures in futures_by_item.items()
+                                if item[1] == dest
+                            },
+                        )
+                        for dest in dests
+                    )
                 )
-            )
+                return
+            for futures in futures_by_item.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
 
-        await asyncio.gather(
-            *(
-                translate_and_store(lang)
-                for lang in constants.SUPPORTED_LANGUAGES  # noqa
-            )
+        for item, translated in zip(items, translations):
+            for future in futures_by_item[item]:
+                if not future.done():
+                    future.set_result(translated)
+
+    async def _call_backend(
+        self, items: list[tuple[str, str]], src: str
+    ) -> list[str]:
+        if self.rate_limit is not None:
+            requests = self.backend.requests_for(items)
+            if requests > self.rate_limit.burst and len(items) > 1:
+                # More than the bucket can ever hold at once: split it so
+                # each part is paced by the bucket instead of being sent
+                # in one burst.
+                half = len(items) // 2
+                first, second = await asyncio.gather(
+                    self._call_backend(items[:half], src),
+                    self._call_backend(items[half:], src),
+                )
+                return first + second
+            await self.rate_limit.acquire(requests)
+        slot = (
+            self.concurrency.slot()
+            if self.concurrency is not None
+            else contextlib.nullcontext()
         )
-        async with AsyncSessionLocal() as db:
-            db.add_all(translations)
-            await db.commit()
+        async with slot:
+            try:
+                start = time.perf_counter()
+                translations = await self.backend.translate_batch(items, src)
+            except Exception:
+                metrics.TRANSLATION_BACKEND_FAILURES.labels(
+                    self.backend.name
+                ).inc()
+                raise
+        elapsed = time.perf_counter() - start
+        translation_memory.record_backend_call(elapsed)
+        metrics.TRANSLATION_BACKEND_DURATION.labels(
+            self.backend.name
+        ).observe(elapsed)
+        self.backend_calls += 1
+        self.items_translated += len(items)
+        return translations
+
+
+batcher = TranslationBatcher(
+    backend=get_translation_backend(settings.TRANSLATION_BACKEND),
+    max_batch_size=settings.TRANSLATION_BATCH_SIZE,
+    max_delay=settings.TRANSLATION_BATCH_DELAY,
+    # A rate limit of 0 disables it.
+    rate_limit=TokenBucket(
+        rate=settings.TRANSLATION_RATE_LIMIT,
+        burst=settings.TRANSLATION_RATE_BURST,
+        shared_key="ratelimit:translation"
+        if settings.TRANSLATION_RATE_LIMIT_SHARED
+        else None,
+    )
+    if settings.TRANSLATION_RATE_LIMIT > 0
+    else None,
+    concurrency=AdaptiveConcurrencyLimit(
+        initial=settings.TRANSLATION_CONCURRENCY_INITIAL,
+        minimum=1,
+        maximum=settings.TRANSLATION_CONCURRENCY_MAX,
+        latency_target=settings.TRANSLATION_LATENCY_TARGET,
+    ),
+)
+
+
+def _collect_batcher_metrics():
+    stats = batcher.stats()
+    yield CounterMetricFamily(
+        "translation_rate_limit_wait_seconds",
+        "Time translation backend calls spent waiting for the rate limit.",
+        value=stats["rate_limit_wait_seconds"],
+    )
+    if stats["concurrency"] is not None:
+        yield GaugeMetricFamily(
+            "translation_concurrency_limit",
+            "Current adaptive limit on concurrent translation backend "
+            "calls.",
+            value=stats["concurrency"]["limit"],
+        )
+        yield GaugeMetricFamily(
+            "translation_backend_in_flight",
+            "Translation backend calls in flight.",
+            value=stats["concurrency"]["in_flight"],
+        )
+
+
+metrics.register_collector(_collect_batcher_metrics)
+
+
+async def translate_text(
+    faq: FAQSchema, lang: str, src: str = "auto"
+) -> tuple[str, str]:
+    start = time.perf_counter()
+    try:
+        translated_question, translated_answer = await asyncio.gather(
+            _translate(faq.question, src, lang),
+            _translate(faq.answer, src, lang),
+        )
+        metrics.TRANSLATION_DURATION.labels(lang).observe(
+            time.perf_counter() - start
+        )
+        return translated_question, translated_answer
     except Exception as e:
+        metrics.TRANSLATION_FAILURES.labels(lang).inc()
         logger.error(e)
         raise e
+
+
+#  private methods
+
+
+async def _translate(text: str, src: str, dest: str) -> str:
+    translated = await translation_memory.get(text, src, dest)
+    if translated is not None:
+        return translated
+
+    translated = await batcher.translate(text, src, dest)
+    await translation_memory.set(text, src, dest, translated)
+    return translated
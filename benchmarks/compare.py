@@ -0,0 +1,70 @@
+"""Compare two benchmark result files written by benchmarks.run:
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+
+Prints the change in throughput and p50/p99 latency for every corpus size
+and scenario found in both, and exits with status 1 if any of them got
+worse by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as results_file:
+        report = json.load(results_file)
+    return {
+        (result["corpus_size"], result["scenario"]): result
+        for result in report["results"]
+    }
+
+
+def change(before: float, after: float) -> float:
+    if before == 0:
+        return 0.0
+    return 100 * (after - before) / before
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percent change counted as a regression (default: 10)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    print(
+        f"{'corpus':>8} {'scenario':<14} {'rps':>9} {'p50':>9} {'p99':>9}"
+    )
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        # Higher throughput is better; lower latency is better.
+        changes = {
+            "throughput_rps": -change(
+                before["throughput_rps"], after["throughput_rps"]
+            ),
+            "p50_ms": change(before["p50_ms"], after["p50_ms"]),
+            "p99_ms": change(before["p99_ms"], after["p99_ms"]),
+        }
+        worse = [name for name, value in changes.items() if value > args.threshold]  # noqa
+        regressions += bool(worse)
+        print(
+            f"{key[0]:>8} {key[1]:<14}"
+            f" {-changes['throughput_rps']:>+8.1f}%"
+            f" {changes['p50_ms']:>+8.1f}%"
+            f" {changes['p99_ms']:>+8.1f}%"
+            + ("  REGRESSION: " + ", ".join(worse) if worse else "")
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+"""Offline benchmark of the FAQ API.
+
+Runs ``app.main:app`` in-process against SQLite (or a scratch Postgres
+given with --database-url), fakeredis and the fake translation backend,
+and writes throughput and latency percentiles per corpus size and scenario
+as JSON:
+
+    python -m benchmarks.run --sizes 1000,10000 --output results.json
+
+The database is dropped and re-seeded for every corpus size, so never
+point --database-url at a database you want to keep.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+LANGUAGES = ["en", "hi", "bn", "es", "fr", "de", "zh", "ja", "ru"]
+SEED_CHUNK_SIZE = 5000
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000",
+        help="comma-separated corpus sizes in FAQs (default: 1000,10000)",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="requests per warm/create/delete scenario (default: 200)",
+    )
+    parser.add_argument(
+        "--cold-requests",
+        type=int,
+        default=20,
+        help="requests per cold scenario (default: 20)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="concurrent in-flight requests (default: 10)",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="async SQLAlchemy URL of a scratch database "
+        "(default: SQLite in a temporary directory)",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark-results.json",
+        help="where to write the JSON results",
+    )
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    # Settings are read when app modules are imported, so this must run
+    # before any of them are.
+    if args.database_url is None:
+        directory = tempfile.mkdtemp(prefix="faq-bench-")
+        args.database_url = (
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["TEST_DATABASE_URL"] = args.database_url
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+    os.environ["TRANSLATION_BACKEND"] = "fake"
+    # Background translation would compete with the measured requests.
+    os.environ["TRANSLATION_WORKERS"] = "0"
+
+
+async def call(app, method, path, query="", body=b""):
+    """Send one request straight to the ASGI app; returns (status, body)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/json"),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    request = {"type": "http.request", "body": body, "more_body": False}
+    done = asyncio.Event()
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal request
+        if request is not None:
+            message, request = request, None
+            return message
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status, b"".join(chunks)
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def measure(name, corpus_size, concurrency, requests, prepare=None):
+    """Run ``requests`` (coroutine factories returning a status) with at
+    most ``concurrency`` in flight. ``prepare`` runs untimed before each."""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(make_request):
+        nonlocal errors
+        async with semaphore:
+            if prepare is not None:
+                await prepare()
+            start = time.perf_counter()
+            status = await make_request()
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_one(request) for request in requests))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "corpus_size": corpus_size,
+        "scenario": name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 3),
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 3),
+        "p99_ms": round(1000 * percentile(latencies, 0.99), 3),
+        "max_ms": round(1000 * latencies[-1], 3),
+    }
+    print(
+        f"{corpus_size:>8} {name:<14} {result['throughput_rps']:>10.1f} rps"
+        f"  p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms"
+        f"  errors {errors}",
+        flush=True,
+    )
+    return result
+
+
+async def seed(corpus_size: int):
+    from sqlalchemy import insert
+
+    from app.database.base import Base
+    from app.database.session import AsyncSessionLocal, engine
+    from app.models.faq import FAQ, FAQSnapshot, FAQTranslation
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        for start in range(0, corpus_size, SEED_CHUNK_SIZE):
+            count = min(SEED_CHUNK_SIZE, corpus_size - start)
+            faq_ids = await FAQ.bulk_create_faqs(
+                faqs=[
+                    {
+                        "question": f"Benchmark question {start + i}?",
+                        "answer": f"<p>Benchmark answer {start + i}.</p>",
+                        "language": "en",
+                    }
+                    for i in range(count)
+                ],
+                db=db,
+            )
+            await db.execute(
+                insert(FAQTranslation),
+                [
+                    {
+                        "faq_id": faq_id,
+                        "language": lang,
+                        "translated_question": f"[{lang}] Benchmark question {faq_id}?",  # noqa
+                        "translated_answer": f"[{lang}] Benchmark answer {faq_id}.",  # noqa
+                    }
+                    for faq_id in faq_ids
+                    for lang in LANGUAGES
+                ],
+            )
+            await db.commit()
+        # Translations are inserted directly rather than by the translation
+        # workers, so the snapshots have to be built from them.
+        for lang in LANGUAGES:
+            await FAQSnapshot.rebuild(lang=lang, db=db)
+        await db.commit()
+
+
+async def reset_cache():
+    from app.core import redis
+
+    await redis.redis.flushall()
+    redis.local_cache.invalidate()
+
+
+async def run_corpus(app, corpus_size: int, args) -> list:
+    results = []
+
+    def get(path, query=""):
+        async def make_request():
+            status, _ = await call(app, "GET", path, query)
+            return status
+
+        return make_request
+
+    # Cold: Redis and the L1 cache are emptied before every request, so
+    # each one rebuilds its language's cache from the database.
+    results.append(
+        await measure(
+            "get_cold",
+            corpus_size,
+            1,
+            [
+                get("/api/faqs/", f"lang={LANGUAGES[i % len(LANGUAGES)]}")
+                for i in range(args.cold_requests)
+            ],
+            prepare=reset_cache,
+        )
+    )
+
+    for lang in LANGUAGES:
+        await call(app, "GET", "/api/faqs/", f"lang={lang}")
+    results.append(
+        await measure(
+            "get_warm",
+            corpus_size,
+            args.concurrency,
+            [
+                get("/api/faqs/", f"lang={LANGUAGES[i % len(LANGUAGES)]}")
+                for i in range(args.requests)
+            ],
+        )
+    )
+    results.append(
+        await measure(
+            "get_warm_page",
+            corpus_size,
+            args.concurrency,
+            [
+                get(
+                    "/api/faqs/",
+                    f"lang={LANGUAGES[i % len(LANGUAGES)]}&limit=20"
+                    f"&cursor={(i * 97) % corpus_size}",
+                )
+                for i in range(args.requests)
+            ],
+        )
+    )
+
+    def update_snapshot(i):
+        # What each stored translation costs the snapshot: one bucket
+        # rewritten, committed on its own like a translation job.
+        async def make_request():
+            from app.database.session import AsyncSessionLocal
+            from app.models.faq import FAQSnapshot
+
+            faq_id = (i * 97) % corpus_size + 1
+            async with AsyncSessionLocal() as db:
+                await FAQSnapshot.set_entry(
+                    lang=LANGUAGES[i % len(LANGUAGES)],
+                    faq_id=faq_id,
+                    question=f"Updated question {faq_id}?",
+                    answer=f"Updated answer {faq_id}.",
+                    db=db,
+                )
+                await db.commit()
+            return 200
+
+        return make_request
+
+    results.append(
+        await measure(
+            "snapshot_update",
+            corpus_size,
+            1,
+            [update_snapshot(i) for i in range(args.requests)],
+        )
+    )
+
+    created_ids = []
+
+    def create(i):
+        async def make_request():
+            status, body = await call(
+                app,
+                "POST",
+                "/api/faqs/create",
+                body=json.dumps(
+                    {
+                        "question": f"Created question {i}?",
+                        "answer": f"<p>Created answer {i}.</p>",
+                        "language": "en",
+                    }
+                ).encode(),
+            )
+            if status < 400:
+                created_ids.append(json.loads(body)["data"]["id"])
+            return status
+
+        return make_request
+
+    results.append(
+        await measure(
+            "create",
+            corpus_size,
+            args.concurrency,
+            [create(i) for i in range(args.requests)],
+        )
+    )
+
+    def delete(faq_id):
+        async def make_request():
+            status, _ = await call(
+                app, "DELETE", "/api/faqs/delete", f"faq_id={faq_id}"
+            )
+            return status
+
+        return make_request
+
+    results.append(
+        await measure(
+            "delete",
+            corpus_size,
+            args.concurrency,
+            [delete(faq_id) for faq_id in created_ids],
+        )
+    )
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    import fakeredis
+    from loguru import logger
+    from sqlalchemy import event
+
+    from app.core import redis
+    from app.database.session import engine
+    from app.main import app
+
+    # Per-request logging would dominate the timings.
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    server = fakeredis.FakeServer()
+    redis.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)  # noqa
+    redis.redis_bytes = fakeredis.FakeAsyncRedis(server=server)
+
+    if engine.dialect.name == "sqlite":
+        # Deletes rely on ON DELETE CASCADE, which SQLite only enforces
+        # when asked to.
+        @event.listens_for(engine.sync_engine, "connect")
+        def enable_foreign_keys(connection, _):
+            cursor = connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    results = []
+    for corpus_size in [int(size) for size in args.sizes.split(",")]:
+        started = time.perf_counter()
+        await seed(corpus_size)
+        await reset_cache()
+        print(
+            f"seeded {corpus_size} FAQs x {len(LANGUAGES)} languages in "
+            f"{time.perf_counter() - started:.1f}s",
+            flush=True,
+        )
+        # Startup work (e.g. building the suggest index) runs against the
+        # seeded corpus, as it would in production.
+        async with app.router.lifespan_context(app):
+            results.extend(await run_corpus(app, corpus_size, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "requests": args.requests,
+            "cold_requests": args.cold_requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_environment(arguments)
+    asyncio.run(main(arguments))
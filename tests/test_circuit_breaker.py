@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from redis import asyncio as aioredis
+
+from app.core import redis
+from app.core.config import settings
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=5, clock=Clock())  # noqa
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["opens"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, clock=clock)  # noqa
+    breaker.record_failure()
+
+    clock.now = 5
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe per reset_timeout.
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now = 9
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_redis_calls_fail_fast_when_circuit_opens(monkeypatch):
+    # Nothing listens on port 1, so every call fails with a connection error.
+    monkeypatch.setattr(
+        redis, "redis", aioredis.from_url("redis://127.0.0.1:1/0")
+    )
+    monkeypatch.setattr(
+        redis,
+        "circuit_breaker",
+        CircuitBreaker("redis", failure_threshold=2, reset_timeout=60),
+    )
+
+    assert await redis.get_redis_with_retry("key") is None
+    assert await redis.set_redis_with_retry("key", "value") is False
+    assert redis.circuit_breaker.state == OPEN
+
+    started = time.perf_counter()
+    assert await redis.get_redis_with_retry("key") is None
+    assert await redis.acquire_lock("lock", timeout=1) is not None
+    assert time.perf_counter() - started < 0.1
+    assert redis.circuit_breaker.failures == 2
+
+
+class SlowPipelines:
+    """A Redis client whose pipelines take ``delay`` seconds to run, while
+    single commands stay fast."""
+
+    def __init__(self, client, delay):
+        self.client = client
+        self.delay = delay
+
+    def pipeline(self, **kwargs):
+        pipe = self.client.pipeline(**kwargs)
+        execute = pipe.execute
+
+        async def slow_execute(*args, **kwargs):
+            await asyncio.sleep(self.delay)
+            return await execute(*args, **kwargs)
+
+        pipe.execute = slow_execute
+        return pipe
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+@pytest.mark.asyncio
+async def test_slow_bulk_reads_do_not_open_the_circuit(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    await client.hset("entries", mapping={"1": "FAQ", "_built_at": "1"})
+    await client.set("key", "value")
+    monkeypatch.setattr(
+        redis,
+        "redis",
+        SlowPipelines(client, delay=settings.REDIS_READ_BUDGET + 0.05),
+    )
+    monkeypatch.setattr(
+        redis,
+        "circuit_breaker",
+        CircuitBreaker("redis", failure_threshold=2, reset_timeout=60),
+    )
+
+    # Slower than a point read may take, but within the bulk budget.
+    hashes = await asyncio.gather(
+        *(redis.get_indexed_hashes([("faqs", "entries")]) for _ in range(3))
+    )
+    assert hashes == [[({"1": "FAQ"}, 1.0, 0)]] * 3
+    assert redis.circuit_breaker.state == CLOSED
+    assert await redis.get_redis_with_retry("key") == "value"
+
+
+@pytest.mark.asyncio
+async def test_uncounted_timeouts_leave_the_circuit_closed(monkeypatch):
+    monkeypatch.setattr(
+        redis,
+        "circuit_breaker",
+        CircuitBreaker("redis", failure_threshold=1, reset_timeout=60),
+    )
+
+    @redis._guarded(0.01, count_timeouts=False)
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(redis.RedisTimeoutError):
+        await slow()
+    assert redis.circuit_breaker.state == CLOSED
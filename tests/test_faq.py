@@ -1,10 +1,19 @@
+from anyio.from_thread import start_blocking_portal
 from fastapi.testclient import TestClient
 from app.main import app
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from app.core.deps import get_db
+from app.core import constants, redis
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.deps import get_db, get_read_db
 from app.core.config import settings
+from app.models.faq import FAQ, FAQSnapshot, FAQTranslation
+from app.services import faq as faq_service
+from app.services import faq_cache
 import pytest
 import httpx
+import json
+import uuid
 
 engine = create_async_engine(
     settings.TEST_DATABASE_URL,
@@ -33,6 +42,65 @@ async def override_get_db():
 client = TestClient(app)
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+
+
+@pytest.fixture(scope="module")
+def portal():
+    # Requests and seeding share one event loop, so pooled database and
+    # Redis connections are never used from another loop. The lifespan
+    # (translation workers etc.) is not started. Sessions the app opens
+    # itself, for exports and cache rebuilds, use the test database too.
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            faq_service, "ReadSessionLocal", TestingAsyncSessionLocal
+        )
+        for name in ["AsyncSessionLocal", "ReadSessionLocal"]:
+            monkeypatch.setattr(faq_cache, name, TestingAsyncSessionLocal)
+        with start_blocking_portal() as portal:
+            client.portal = portal
+            try:
+                yield portal
+            finally:
+                client.portal = None
+                portal.call(engine.dispose)
+
+
+async def seed_faqs(translations: list[dict]) -> list[int]:
+    """Store one FAQ per item of ``translations`` (language -> (question,
+    answer)) as the translation worker would: table, snapshot, then cache.
+    Returns their ids."""
+    faq_ids = []
+    async with TestingAsyncSessionLocal() as db:
+        for texts in translations:
+            faq = FAQ(question="Seeded", answer="Seeded", language="en")
+            db.add(faq)
+            await db.flush()
+            faq_ids.append(faq.id)
+            for lang, (question, answer) in texts.items():
+                await FAQTranslation.replace_faq_translation(
+                    db=db,
+                    faq_id=faq.id,
+                    translated_question=question,
+                    translated_answer=answer,
+                    lang=lang,
+                )
+                await FAQSnapshot.set_entry(
+                    lang=lang,
+                    faq_id=faq.id,
+                    question=question,
+                    answer=answer,
+                    db=db,
+                )
+            await db.flush()
+        await db.commit()
+
+    for faq_id, texts in zip(faq_ids, translations):
+        for lang, (question, answer) in texts.items():
+            await faq_cache.set_faq(
+                lang, {"id": faq_id, "question": question, "answer": answer}
+            )
+    return faq_ids
 
 
 def test_read_root():
@@ -65,6 +133,353 @@ async def test_get_faqs():
         assert isinstance(response.json()["data"]["faqs"], list)
 
 
+def test_metrics():
+    client.get("/")
+    client.get("/api/faqs/?lang=en&limit=0")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
+    assert 'route="/api/faqs/",status="400"' in response.text
+    assert "redis_requests_total" in response.text
+
+
+def test_get_faqs_invalid_limit():
+    response = client.get("/api/faqs/?lang=en&limit=0")
+    assert response.status_code == 400
+
+
+def test_bulk_create_faqs_invalid_body():
+    response = client.post(
+        "/api/faqs/bulk",
+        content=b'{"question": "Q", "answer": "A", "language": "en"}',
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 400
+
+
+def test_bulk_create_faqs(portal):
+    response = client.post(
+        "/api/faqs/bulk",
+        json=[
+            {"question": "Bulk Q1", "answer": "Bulk A1", "language": "en"},
+            {"question": "Bulk Q2", "answer": "Bulk A2", "language": "xx"},
+            {"question": "Bulk Q3", "answer": "Bulk A3", "language": "hi"},
+        ],
+    )
+    assert response.status_code == 207
+    data = response.json()["data"]
+    faq_ids = [result.get("id") for result in data["results"]]
+    assert data == {
+        "created": 2,
+        "failed": 1,
+        "results": [
+            {"index": 0, "success": True, "id": faq_ids[0]},
+            {
+                "index": 1,
+                "success": False,
+                "error": "Language 'xx' is not supported.",
+            },
+            {"index": 2, "success": True, "id": faq_ids[2]},
+        ],
+    }
+    assert faq_ids[0] < faq_ids[2]
+
+    async def load(faq_id):
+        async with TestingAsyncSessionLocal() as db:
+            return await FAQ.get_faq(faq_id=faq_id, db=db)
+
+    for faq_id, (question, answer, language) in [
+        (faq_ids[0], ("Bulk Q1", "Bulk A1", "en")),
+        (faq_ids[2], ("Bulk Q3", "Bulk A3", "hi")),
+    ]:
+        faq = portal.call(load, faq_id)
+        assert (faq.question, faq.answer, faq.language) == (
+            question,
+            answer,
+            language,
+        )
+        # Every valid FAQ is queued for translation into every language.
+        status = client.get(f"/api/faqs/{faq_id}/translation-status")
+        languages = [job["language"] for job in status.json()["data"]["languages"]]  # noqa
+        assert languages == sorted(constants.SUPPORTED_LANGUAGES)
+
+
+def test_bulk_create_faqs_all_valid(portal):
+    response = client.post(
+        "/api/faqs/bulk",
+        json=[{"question": "All Q1", "answer": "All A1", "language": "en"}],
+    )
+    assert response.status_code == 201
+    assert response.json()["success"] is True
+    assert response.json()["data"]["created"] == 1
+
+
+def test_bulk_create_faqs_none_created(portal):
+    response = client.post(
+        "/api/faqs/bulk",
+        json=[
+            {"question": "None Q1", "answer": "None A1", "language": "xx"},
+            {"question": "None Q2"},
+        ],
+    )
+    assert response.status_code == 422
+    data = response.json()
+    assert data["success"] is False
+    assert (data["data"]["created"], data["data"]["failed"]) == (0, 2)
+
+
+def test_bulk_create_faqs_keeps_chunks_before_a_database_error(
+    portal, monkeypatch
+):
+    monkeypatch.setattr(constants, "FAQS_BULK_CHUNK_SIZE", 2)
+    bulk_create_faqs = FAQ.bulk_create_faqs
+    calls = 0
+
+    async def failing_second_chunk(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+        return await bulk_create_faqs(**kwargs)
+
+    monkeypatch.setattr(FAQ, "bulk_create_faqs", failing_second_chunk)
+
+    response = client.post(
+        "/api/faqs/bulk",
+        json=[
+            {"question": f"Chunk Q{i}", "answer": f"Chunk A{i}", "language": "en"}  # noqa
+            for i in range(5)
+        ],
+    )
+    assert response.status_code == 207
+    results = response.json()["data"]["results"]
+    assert [result["success"] for result in results] == [
+        True,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert results[2] == {
+        "index": 2,
+        "success": False,
+        "error": "Could not be saved.",
+    }
+
+    async def load(faq_id):
+        async with TestingAsyncSessionLocal() as db:
+            return await FAQ.get_faq(faq_id=faq_id, db=db)
+
+    for i in (0, 1, 4):
+        faq = portal.call(load, results[i]["id"])
+        assert faq.question == f"Chunk Q{i}"
+
+
+def test_export_faqs_invalid_language():
+    response = client.get("/api/faqs/export?lang=hi,xx")
+    assert response.status_code == 400
+
+
+def test_export_faqs(portal):
+    faq_ids = portal.call(
+        seed_faqs,
+        [
+            {"hi": ("[hi] Export Q1", "[hi] Export A1"), "bn": ("[bn] Q1", "[bn] A1")},  # noqa
+            {"bn": ("[bn] Export Q2", "[bn] Export A2")},
+            {"hi": ("[hi] Export Q3", "[hi] Export A3")},
+        ],
+    )
+    expected = [
+        {
+            "id": faq_ids[0],
+            "translations": {
+                "hi": {"question": "[hi] Export Q1", "answer": "[hi] Export A1"}  # noqa
+            },
+        },
+        {"id": faq_ids[1], "translations": {}},
+        {
+            "id": faq_ids[2],
+            "translations": {
+                "hi": {"question": "[hi] Export Q3", "answer": "[hi] Export A3"}  # noqa
+            },
+        },
+    ]
+
+    def export(after_id):
+        response = client.get(f"/api/faqs/export?lang=hi&after_id={after_id}")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        faqs = [json.loads(line) for line in response.text.splitlines()]
+        for faq in faqs:
+            assert faq.pop("created_at")
+            assert faq.pop("question") == faq.pop("answer") == "Seeded"
+            assert faq.pop("language") == "en"
+        return faqs
+
+    assert export(faq_ids[0] - 1) == expected
+    # An interrupted export resumes after the last id it received.
+    assert export(faq_ids[0]) == expected[1:]
+
+
+def test_search_faqs_invalid_query():
+    response = client.get("/api/faqs/search?q=%20&lang=en")
+    assert response.status_code == 400
+
+
+def test_search_faqs(portal):
+    # A word no other FAQ contains, so the results are exactly these.
+    word = f"refund{uuid.uuid4().hex[:8]}"
+    faq_ids = portal.call(
+        seed_faqs,
+        [
+            {"en": (f"How do {word} work?", "Within five days.")},
+            {"en": ("When is money returned?", f"Via {word} in five days.")},
+            {"en": ("How do returns work?", "Within five days.")},
+            {"hi": (f"{word} kaise?", "Paanch din mein.")},
+        ],
+    )
+    # Matches in the question rank above matches in the answer.
+    faqs = [
+        {"id": faq_ids[0], "question": f"How do {word} work?", "answer": "Within five days."},  # noqa
+        {"id": faq_ids[1], "question": "When is money returned?", "answer": f"Via {word} in five days."},  # noqa
+    ]
+
+    response = client.get(f"/api/faqs/search?q={word}&lang=en")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"faqs": faqs, "next_offset": None}
+
+    response = client.get(f"/api/faqs/search?q={word}&lang=en&limit=1")
+    assert response.json()["data"] == {"faqs": faqs[:1], "next_offset": 1}
+    response = client.get(
+        f"/api/faqs/search?q={word}&lang=en&limit=1&offset=1"
+    )
+    assert response.json()["data"] == {"faqs": faqs[1:], "next_offset": 2}
+
+
+def test_suggest_faqs():
+    response = client.get("/api/faqs/suggest?prefix=how&lang=en")
+    assert response.status_code == 200
+    assert isinstance(response.json()["data"]["suggestions"], list)
+
+    response = client.get("/api/faqs/suggest?prefix=%20&lang=en")
+    assert response.status_code == 400
+
+
+def test_get_faq_invalid_language():
+    response = client.get("/api/faqs/1?lang=hi,xx")
+    assert response.status_code == 400
+
+
+def test_get_faq_multiple_languages(portal):
+    hi = {"question": "[hi] Multi Q", "answer": "[hi] Multi A"}
+    bn = {"question": "[bn] Multi Q", "answer": "[bn] Multi A"}
+    (faq_id,) = portal.call(
+        seed_faqs,
+        [{"hi": tuple(hi.values()), "bn": tuple(bn.values())}],
+    )
+
+    # The same again once the cache is warm.
+    for _ in range(2):
+        response = client.get(f"/api/faqs/{faq_id}?lang=hi,bn,fr")
+        assert response.status_code == 200
+        assert response.json()["data"] == {
+            "id": faq_id,
+            "translations": {"hi": hi, "bn": bn},
+        }
+
+    response = client.get("/api/faqs/?lang=hi,bn")
+    assert response.status_code == 200
+    faqs = response.json()["data"]["faqs"]
+    assert set(faqs) == {"hi", "bn"}
+    for lang, translation in [("hi", hi), ("bn", bn)]:
+        assert faqs[lang][-1] == {"id": faq_id, **translation}
+        ids = [faq["id"] for faq in faqs[lang]]
+        assert ids == sorted(set(ids))
+
+
+def test_get_faqs_many_skips_rebuilds_while_redis_is_down(
+    portal, monkeypatch
+):
+    breaker = CircuitBreaker("redis", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(redis, "circuit_breaker", breaker)
+    rebuilds = []
+
+    async def rebuild(lang):
+        rebuilds.append(lang)
+
+    monkeypatch.setattr(faq_cache, "rebuild", rebuild)
+
+    response = client.get("/api/faqs/?lang=hi,bn&limit=2")
+    assert response.status_code == 200
+    assert set(response.json()["data"]["faqs"]) == {"hi", "bn"}
+    assert rebuilds == []
+
+
+def test_get_faqs_paginated(portal):
+    faq_ids = portal.call(
+        seed_faqs,
+        [{"en": (f"Page question {i}", f"Page answer {i}")} for i in range(3)],
+    )
+    faqs = [
+        {"id": faq_id, "question": f"Page question {i}", "answer": f"Page answer {i}"}  # noqa
+        for i, faq_id in enumerate(faq_ids)
+    ]
+    # Keyset pages start after the cursor, so the first one starts at the
+    # first seeded FAQ whatever else the database holds.
+    cursor = faq_ids[0] - 1
+
+    response = client.get(f"/api/faqs/?lang=en&limit=2&cursor={cursor}")
+    assert response.status_code == 200
+    assert response.json()["data"] == {
+        "faqs": faqs[:2],
+        "next_cursor": faq_ids[1],
+    }
+
+    response = client.get(f"/api/faqs/?lang=en&limit=2&cursor={faq_ids[1]}")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"faqs": faqs[2:], "next_cursor": None}
+
+
+def test_translation_status(portal, monkeypatch):
+    # No worker may pick the jobs up while the status is read.
+    monkeypatch.setattr(settings, "TRANSLATION_WORKERS", 0)
+    create_response = client.post(
+        "/api/faqs/create",
+        json={
+            "question": "Status Test Question",
+            "answer": "Status Test Answer",
+            "language": "en",
+        },
+    )
+    assert create_response.status_code == 201
+    faq_id = create_response.json()["data"]["id"]
+
+    response = client.get(f"/api/faqs/{faq_id}/translation-status")
+    assert response.status_code == 200
+    assert response.json()["data"] == {
+        "faq_id": faq_id,
+        "total": 9,
+        "done": 0,
+        "failed": 0,
+        "complete": False,
+        "languages": [
+            {
+                "language": lang,
+                "status": "pending",
+                "attempts": 0,
+                "last_error": None,
+            }
+            for lang in sorted(constants.SUPPORTED_LANGUAGES)
+        ],
+    }
+
+
+def test_translation_status_of_a_missing_faq(portal):
+    response = client.get(f"/api/faqs/{2**31 - 1}/translation-status")
+    assert response.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_delete_nonexistent_faq():
     async with httpx.AsyncClient(
@@ -117,3 +532,14 @@ async def test_random_language_support():
         )
 
         assert response.status_code == 400
+
+
+def test_user_page_conditional_get():
+    response = client.get("/user")
+    assert response.status_code == 200
+    assert response.headers["etag"]
+
+    cached_response = client.get(
+        "/user", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert cached_response.status_code == 304
@@ -0,0 +1,310 @@
+import asyncio
+import gzip
+import json
+import time
+
+import fakeredis
+import pytest
+
+from app.core import redis
+from app.core.circuit_breaker import CircuitBreaker
+from app.services import faq_cache
+
+
+class Database:
+    """Stands in for faq_service's reads: each language's FAQs in id
+    order, and a log of the loads that reached it."""
+
+    def __init__(self):
+        self.faqs = {
+            "en": [
+                {"id": faq_id, "question": f"Q{faq_id}", "answer": "A"}
+                for faq_id in [1, 2, 3]
+            ]
+        }
+        self.loads = []
+
+    async def get_all_faqs_by_language(
+        self, db, lang, limit=None, cursor=None
+    ):
+        self.loads.append((lang, limit, cursor))
+        faqs = [
+            faq
+            for faq in self.faqs.get(lang, [])
+            if cursor is None or faq["id"] > cursor
+        ]
+        return faqs[:limit] if limit is not None else faqs
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis,
+        "redis",
+        fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+    )
+    monkeypatch.setattr(
+        redis, "redis_bytes", fakeredis.FakeAsyncRedis(server=server)
+    )
+    monkeypatch.setattr(
+        redis, "local_cache", redis.LocalCache(max_entries=100, ttl=30)
+    )
+    monkeypatch.setattr(
+        redis,
+        "circuit_breaker",
+        CircuitBreaker(name="redis", failure_threshold=5, reset_timeout=5),
+    )
+    return server
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = Database()
+    monkeypatch.setattr(
+        faq_cache.faq_service,
+        "get_all_faqs_by_language",
+        database.get_all_faqs_by_language,
+    )
+    return database
+
+
+@pytest.mark.asyncio
+async def test_rebuild_is_skipped_while_redis_is_down(server, database):
+    server.connected = False
+
+    await faq_cache.rebuild("en")
+
+    assert database.loads == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_stores_the_language(server, database):
+    await faq_cache.rebuild("en")
+
+    assert database.loads == [("en", None, None)]
+    redis.local_cache.invalidate()
+    assert await faq_cache.get_faqs("en") == (0, database.faqs["en"])
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_the_rebuild_is_not_stored(
+    server, database
+):
+    lock_key = "lock:faqs:en"
+    token = await redis.acquire_lock(lock_key, 10)
+    started = time.monotonic()
+    load = asyncio.create_task(faq_cache.load_faqs("en", db=None))
+
+    # The holder finishes without storing anything, e.g. because the
+    # language changed during its query.
+    await asyncio.sleep(0.1)
+    assert database.loads == []
+    await redis.release_lock(lock_key, token)
+
+    assert await load == (0, database.faqs["en"])
+    assert database.loads == [("en", None, None)]
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_not_cached_from_an_out_of_date_l1_list(
+    server, database
+):
+    await faq_cache.rebuild("en")
+    # Another worker adds a FAQ; its invalidation has not reached this one.
+    faq = {"id": 4, "question": "Q4", "answer": "A"}
+    await redis.redis.hset("faqs:en:entries", "4", json.dumps(faq))
+    await redis.redis.zadd("faqs:en:ids", {"4": 4})
+    await redis.redis.incr("gen:faqs:en")
+
+    cached = await faq_cache.get_response_body("en")
+    generation, faqs = await faq_cache.get_faqs("en")
+    assert (cached.generation, generation) == (1, 0)
+    await faq_cache.set_response_body(
+        "en", None, None, b'{"faqs": []}', generation, cached
+    )
+
+    redis.local_cache.invalidate()
+    assert (await faq_cache.get_response_body("en")).body is None
+    generation, faqs = await faq_cache.get_faqs("en")
+    assert generation == 1
+    assert faqs == database.faqs["en"] + [faq]
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_the_generation_not_the_body(server, database):
+    await faq_cache.invalidate_language("en")
+    await faq_cache.rebuild("en")
+    cached = await faq_cache.get_response_body("en", encoding="gzip")
+    generation, _ = await faq_cache.get_faqs("en")
+    stored = await faq_cache.set_response_body(
+        "en", None, None, b'{"faqs": []}', generation, cached
+    )
+    assert stored.etag == cached.etag is not None
+
+    # The body has expired, but the ETag is still known.
+    await redis.redis.delete("faqs:en:bodies")
+    redis.local_cache.invalidate()
+    cached = await faq_cache.get_response_body("en", encoding="gzip")
+    assert cached.body is None
+    assert cached.etag == stored.etag
+
+    await faq_cache.invalidate_language("en")
+    assert (await faq_cache.get_response_body("en")).etag != stored.etag
+
+
+@pytest.mark.asyncio
+async def test_generations_do_not_repeat_after_redis_loses_its_data(
+    server, database
+):
+    await faq_cache.invalidate_language("en")
+    before = await faq_cache.get_generation("en")
+
+    await redis.redis.flushall()
+    await faq_cache.invalidate_language("en")
+
+    assert await faq_cache.get_generation("en") > before
+
+
+@pytest.mark.asyncio
+async def test_only_the_requested_encoding_is_compressed_and_cached(
+    server, database
+):
+    await faq_cache.invalidate_language("en")
+    generation = await faq_cache.get_generation("en")
+    body = json.dumps(database.faqs["en"] * 50).encode()
+
+    cached = await faq_cache.get_response_body("en", encoding="gzip")
+    stored = await faq_cache.set_response_body(
+        "en", None, None, body, generation, cached
+    )
+    assert stored.encoding == "gzip"
+    assert gzip.decompress(stored.body) == body
+    assert await redis.redis.hkeys("faqs:en:bodies") == ["all:gzip"]
+
+    redis.local_cache.invalidate()
+    assert (await faq_cache.get_response_body("en", encoding="gzip")).body
+    assert (await faq_cache.get_response_body("en")).body is None
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_are_cached_uncompressed(server, database):
+    await faq_cache.invalidate_language("en")
+    generation = await faq_cache.get_generation("en")
+
+    cached = await faq_cache.get_response_body("en", 0, 20, encoding="br")
+    await faq_cache.set_response_body(
+        "en", 0, 20, b'{"faqs": []}', generation, cached
+    )
+
+    redis.local_cache.invalidate()
+    cached = await faq_cache.get_response_body("en", 0, 20, encoding="br")
+    assert (cached.encoding, cached.body) == ("identity", b'{"faqs": []}')
+
+
+@pytest.mark.asyncio
+async def test_set_faq_and_delete_faq_update_the_hash_and_index(
+    server, database
+):
+    await faq_cache.rebuild("en")
+    await faq_cache.rebuild("hi")
+    faqs = database.faqs["en"]
+    updated = {"id": 2, "question": "Q2?", "answer": "Updated"}
+    added = {"id": 5, "question": "Q5", "answer": "A"}
+
+    assert await faq_cache.set_faq("en", updated)
+    assert await faq_cache.set_faq("en", added)
+    assert await faq_cache.set_faq("hi", added)
+    redis.local_cache.invalidate()
+    generation, cached = await faq_cache.get_faqs("en")
+    assert cached == [faqs[0], updated, faqs[2], added]
+    assert await faq_cache.get_faqs("en", 2, 2) == (
+        generation,
+        [faqs[2], added],
+    )
+
+    assert await faq_cache.delete_faq(5)
+    redis.local_cache.invalidate()
+    assert await faq_cache.get_faqs("en") == (
+        generation + 1,
+        [faqs[0], updated, faqs[2]],
+    )
+    assert await faq_cache.get_faqs("en", 2, 2) == (generation + 1, [faqs[2]])
+    assert (await faq_cache.get_faqs("hi"))[1] == []
+
+
+@pytest.mark.asyncio
+async def test_lists_read_before_a_change_are_not_stored(server, database):
+    await faq_cache.rebuild("en")
+    generation = await faq_cache.get_generation("en")
+    faq = {"id": 4, "question": "Q4", "answer": "A"}
+    await faq_cache.set_faq("en", faq)
+
+    assert not await faq_cache.store_faqs(
+        "en", database.faqs["en"], generation
+    )
+    # The stale list would have dropped the FAQ added meanwhile.
+    redis.local_cache.invalidate()
+    _, faqs = await faq_cache.get_faqs("en")
+    assert faqs == database.faqs["en"] + [faq]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [None, 2])
+async def test_ageing_entries_are_served_while_they_are_refreshed(
+    server, database, limit
+):
+    await faq_cache.rebuild("en")
+    built_at = time.time() - faq_cache.FAQS_CACHE_SOFT_TTL
+    await redis.redis.hset("faqs:en:entries", "_built_at", str(built_at))
+    database.faqs["en"].append({"id": 4, "question": "Q4", "answer": "A"})
+    redis.local_cache.invalidate()
+
+    _, faqs = await faq_cache.get_faqs("en", limit=limit)
+    assert [faq["id"] for faq in faqs] == [1, 2, 3][:limit]
+    assert faq_cache._refresh_tasks
+    await asyncio.gather(*faq_cache._refresh_tasks)
+
+    assert database.loads == [("en", None, None)] * 2
+    redis.local_cache.invalidate()
+    _, faqs = await faq_cache.get_faqs("en")
+    assert [faq["id"] for faq in faqs] == [1, 2, 3, 4]
+    assert not faq_cache._refresh_tasks
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_are_not_refreshed(server, database):
+    await faq_cache.rebuild("en")
+    redis.local_cache.invalidate()
+
+    await faq_cache.get_faqs("en")
+    await faq_cache.get_faqs("en", limit=2)
+
+    assert not faq_cache._refresh_tasks
+    assert database.loads == [("en", None, None)]
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_faq_evicts_it_everywhere(server, database):
+    for lang in ["en", "hi"]:
+        database.faqs[lang] = database.faqs["en"]
+        await faq_cache.rebuild(lang)
+    before = {}
+    for lang in ["en", "hi"]:
+        # Read once so the L1 cache holds the list too.
+        before[lang], faqs = await faq_cache.get_faqs(lang)
+        assert [faq["id"] for faq in faqs] == [1, 2, 3]
+
+    assert await faq_cache.delete_faq(2)
+
+    for lang in ["en", "hi"]:
+        generation, faqs = await faq_cache.get_faqs(lang)
+        assert generation > before[lang]
+        assert [faq["id"] for faq in faqs] == [1, 3]
+    redis.local_cache.invalidate()
+    for lang in ["en", "hi"]:
+        _, faqs = await faq_cache.get_faqs(lang)
+        assert [faq["id"] for faq in faqs] == [1, 3]
+        assert (await faq_cache.get_faqs(lang, 1, 1))[1] == [faqs[1]]
+    assert (await faq_cache.get_faq(2, ["en", "hi"]))[0] == {}
@@ -0,0 +1,130 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import constants
+from app.core.config import settings
+from app.database.base import Base
+from app.models.faq import FAQ, FAQSnapshot, FAQTranslation
+
+BUCKET_SIZE = constants.FAQS_SNAPSHOT_BUCKET_SIZE
+
+
+@pytest_asyncio.fixture(params=["sqlite", "postgresql"])
+async def db(request, tmp_path):
+    """A session on each snapshot path: the read-modify-write fallback on
+    SQLite, and JSONB || and - on Postgres when TEST_DATABASE_URL is one.
+    Everything runs in a transaction that is rolled back afterwards."""
+    if request.param == "sqlite":
+        url = f"sqlite+aiosqlite:///{tmp_path / 'snapshots.db'}"
+    elif (settings.TEST_DATABASE_URL or "").startswith("postgresql"):
+        url = settings.TEST_DATABASE_URL
+    else:
+        pytest.skip("TEST_DATABASE_URL is not a Postgres database")
+
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+
+def faq(faq_id, lang="hi"):
+    return {
+        "id": faq_id,
+        "question": f"[{lang}] Q{faq_id}",
+        "answer": f"[{lang}] A{faq_id}",
+    }
+
+
+async def set_entries(db, lang, faq_ids):
+    for faq_id in faq_ids:
+        entry = faq(faq_id, lang)
+        await FAQSnapshot.set_entry(
+            lang, faq_id, entry["question"], entry["answer"], db
+        )
+    await db.flush()
+
+
+@pytest.mark.asyncio
+async def test_get_faqs_without_a_snapshot(db):
+    assert await FAQSnapshot.get_faqs("hi", db) is None
+
+
+@pytest.mark.asyncio
+async def test_set_entry_fills_buckets_in_id_order(db):
+    faq_ids = [BUCKET_SIZE * 3 + 1, 2, BUCKET_SIZE + 5, 1, BUCKET_SIZE]
+    await set_entries(db, "hi", faq_ids)
+    await set_entries(db, "bn", [1])
+
+    assert await FAQSnapshot.get_faqs("hi", db) == [
+        faq(faq_id) for faq_id in sorted(faq_ids)
+    ]
+    assert await FAQSnapshot.get_faqs("bn", db) == [faq(1, "bn")]
+
+
+@pytest.mark.asyncio
+async def test_set_entry_replaces_an_existing_entry(db):
+    await set_entries(db, "hi", [1, 2])
+
+    await FAQSnapshot.set_entry("hi", 2, "Updated?", "Updated.", db)
+    await db.flush()
+    db.expire_all()
+
+    assert await FAQSnapshot.get_faqs("hi", db) == [
+        faq(1),
+        {"id": 2, "question": "Updated?", "answer": "Updated."},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_remove_faq_drops_it_from_every_language(db):
+    await set_entries(db, "hi", [1, 2, BUCKET_SIZE + 1])
+    await set_entries(db, "bn", [1, 2])
+
+    await FAQSnapshot.remove_faq(2, db)
+    await FAQSnapshot.remove_faq(BUCKET_SIZE * 10, db)
+    await db.flush()
+    db.expire_all()
+
+    assert await FAQSnapshot.get_faqs("hi", db) == [
+        faq(1),
+        faq(BUCKET_SIZE + 1),
+    ]
+    assert await FAQSnapshot.get_faqs("bn", db) == [faq(1, "bn")]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_replaces_the_snapshot_from_translations(db):
+    faqs = [FAQ(question=f"Q{i}", answer=f"A{i}") for i in range(3)]
+    db.add_all(faqs)
+    await db.flush()
+    db.add_all(
+        FAQTranslation(
+            faq_id=row.id,
+            language="hi",
+            translated_question=f"[hi] Q{row.id}",
+            translated_answer=f"[hi] A{row.id}",
+        )
+        for row in faqs
+    )
+    # A stale entry, for a FAQ the translations no longer have.
+    await set_entries(db, "hi", [BUCKET_SIZE * 10])
+    await set_entries(db, "bn", [1])
+
+    await FAQSnapshot.rebuild("hi", db)
+    await db.flush()
+
+    assert await FAQSnapshot.get_faqs("hi", db) == [
+        faq(row.id) for row in faqs
+    ]
+    assert await FAQSnapshot.get_faqs("bn", db) == [faq(1, "bn")]
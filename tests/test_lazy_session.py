@@ -0,0 +1,34 @@
+import pytest
+
+from app.database.session import LazySession
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = 0
+
+    async def execute(self, statement):
+        return statement
+
+    async def close(self):
+        self.closed += 1
+
+
+@pytest.mark.asyncio
+async def test_session_created_on_first_use_only():
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    unused = LazySession(factory)
+    await unused.close()
+    assert sessions == []
+
+    session = LazySession(factory)
+    assert await session.execute("SELECT 1") == "SELECT 1"
+    assert await session.execute("SELECT 2") == "SELECT 2"
+    await session.close()
+    assert len(sessions) == 1
+    assert sessions[0].closed == 1
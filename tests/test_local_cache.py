@@ -0,0 +1,62 @@
+import time
+
+from app.core.redis import LocalCache
+
+
+def test_lru_eviction():
+    cache = LocalCache(max_entries=2, ttl=60)
+    cache.set("faqs:en", ["en"], "faqs:en", cache.epoch("faqs:en"))
+    cache.set("faqs:hi", ["hi"], "faqs:hi", cache.epoch("faqs:hi"))
+    assert cache.get("faqs:en") == ["en"]
+
+    cache.set("faqs:bn", ["bn"], "faqs:bn", cache.epoch("faqs:bn"))
+    assert cache.get("faqs:hi") is None
+    assert cache.get("faqs:en") == ["en"]
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = LocalCache(max_entries=2, ttl=10)
+    cache.set("faqs:en", ["en"], "faqs:en", cache.epoch("faqs:en"))
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("faqs:en") is None
+
+
+def test_invalidate_namespace_drops_its_pages_only():
+    cache = LocalCache(max_entries=10, ttl=60)
+    for key in ["faqs:en", "faqs:en:page:0:20", "faqs:eng", "faqs:hi"]:
+        namespace = ":".join(key.split(":")[:2])
+        cache.set(key, [key], namespace, cache.epoch(namespace))
+
+    cache.invalidate("faqs:en")
+
+    assert cache.get("faqs:en") is None
+    assert cache.get("faqs:en:page:0:20") is None
+    assert cache.get("faqs:eng") == ["faqs:eng"]
+    assert cache.get("faqs:hi") == ["faqs:hi"]
+
+
+def test_values_read_before_invalidation_are_not_cached():
+    cache = LocalCache(max_entries=10, ttl=60)
+    epoch = cache.epoch("faqs:en")
+    cache.invalidate("faqs:en")
+
+    cache.set("faqs:en", ["stale"], "faqs:en", epoch)
+    assert cache.get("faqs:en") is None
+
+
+def test_invalidated_within(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_entries=2, ttl=60)
+    assert not cache.invalidated_within("faqs:en", 5)
+
+    cache.invalidate("faqs:en")
+    assert cache.invalidated_within("faqs:en", 5)
+    assert not cache.invalidated_within("faqs:hi", 5)
+
+    now[0] = 106.0
+    assert not cache.invalidated_within("faqs:en", 5)
+    cache.invalidate()
+    assert cache.invalidated_within("faqs:hi", 5)
@@ -0,0 +1,58 @@
+from app.core.prefix_index import PrefixIndex
+
+
+def test_search_matches_normalized_prefix_in_order():
+    index = PrefixIndex(max_entries=10, max_length=100)
+    index.add(1, "How do refunds work?")
+    index.add(2, "How  do I reset my password?")
+    index.add(3, "Where is my order?")
+
+    results = index.search("HOW DO", limit=10)
+    assert [result["id"] for result in results] == [2, 1]
+    assert results[0]["question"] == "How  do I reset my password?"
+    assert index.search("how do", limit=1) == results[:1]
+    assert index.search("why", limit=10) == []
+
+
+def test_add_replaces_and_remove_deletes():
+    index = PrefixIndex(max_entries=10, max_length=100)
+    index.add(1, "How do refunds work?")
+    index.add(1, "Where is my order?")
+    assert index.search("how", limit=10) == []
+    assert len(index) == 1
+
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert index.search("where", limit=10) == []
+
+
+def test_bounded_size():
+    index = PrefixIndex(max_entries=2, max_length=5)
+    for entry_id in range(3):
+        index.add(entry_id, f"question {entry_id}")
+
+    assert len(index) == 2
+    assert index.stats()["evictions"] == 1
+    assert [result["id"] for result in index.search("q", limit=10)] == [1, 2]
+    assert index.search("q", limit=10)[0]["question"] == "quest"
+
+
+def test_add_many_matches_adding_one_by_one():
+    entries = [
+        (entry_id % 7, f"Question {entry_id}?") for entry_id in range(20)
+    ]
+    one_by_one = PrefixIndex(max_entries=5, max_length=100)
+    for entry_id, text in entries:
+        one_by_one.add(entry_id, text)
+
+    bulk = PrefixIndex(max_entries=5, max_length=100)
+    bulk.add_many(entries)
+
+    assert bulk.search("question", limit=10) == one_by_one.search(
+        "question", limit=10
+    )
+    assert bulk.stats() == one_by_one.stats()
+    bulk.add(1, "Another question?")
+    assert bulk.search("another", limit=10) == [
+        {"id": 1, "question": "Another question?"}
+    ]
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from app.core.rate_limit import AdaptiveConcurrencyLimit, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_once_the_burst_is_spent():
+    bucket = TokenBucket(rate=100, burst=2)
+
+    await bucket.acquire()
+    await bucket.acquire()
+    assert bucket.waited < 0.005
+
+    await bucket.acquire()
+    assert bucket.waited >= 0.005
+
+
+def test_limit_grows_by_about_one_per_round_of_successes():
+    clock = FakeClock()
+    limit = AdaptiveConcurrencyLimit(
+        initial=4, minimum=1, maximum=16, latency_target=1, clock=clock
+    )
+
+    for _ in range(4):
+        limit.record(True, clock())
+
+    assert 4.8 < limit.limit < 5
+
+
+def test_limit_halves_once_per_round_of_failures():
+    clock = FakeClock()
+    limit = AdaptiveConcurrencyLimit(
+        initial=8, minimum=1, maximum=16, latency_target=1, clock=clock
+    )
+
+    # Calls that started together all fail: only the first one counts.
+    clock.now = 1
+    for _ in range(3):
+        limit.record(False, 0)
+    assert limit.limit == 4
+
+    limit.record(False, clock())
+    assert limit.limit == 2
+    assert limit.decreases == 2
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_the_limit_wait_for_a_slot():
+    limit = AdaptiveConcurrencyLimit(
+        initial=1, minimum=1, maximum=1, latency_target=1
+    )
+    order = []
+
+    async def call(name):
+        async with limit.slot():
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+
+    await asyncio.gather(call("a"), call("b"))
+
+    assert order == ["a start", "a end", "b start", "b end"]
@@ -0,0 +1,49 @@
+import gzip
+
+import pytest
+
+from app.core import responses
+from app.core.responses import choose_encoding, compress, etag_matches
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, "identity"),
+        ("", "identity"),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", "identity"),
+        ("*", "br"),
+        ("deflate", "identity"),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.delitem(responses.COMPRESSORS, "br")
+
+    assert choose_encoding("gzip, br") == "gzip"
+    assert choose_encoding("br") == "identity"
+
+
+@pytest.mark.asyncio
+async def test_compress_only_bodies_worth_it():
+    body = b'{"faqs": []}'
+    assert await compress(body, "gzip") == ("identity", body)
+
+    body = b'{"question": "How do refunds work?"}' * 100
+    encoding, compressed = await compress(body, "gzip")
+    assert encoding == "gzip"
+    assert gzip.decompress(compressed) == body
+    assert await compress(body, "identity") == ("identity", body)
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"a"')
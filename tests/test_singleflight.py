@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["faq"]
+
+    results = await asyncio.gather(
+        *(single_flight.do("faqs:en", load) for _ in range(50))
+    )
+
+    assert calls == 1
+    assert all(result == ["faq"] for result in results)
+    assert not single_flight.in_flight("faqs:en")
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    results = await asyncio.gather(
+        *(single_flight.do("faqs:en", load) for _ in range(5)),
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        await single_flight.do("faqs:en", load)
+    assert calls == 2
@@ -0,0 +1,42 @@
+import pytest
+
+from app.core import redis
+from app.services.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    async def get_redis_with_retry(key):
+        return None
+
+    async def set_redis_with_retry(key, value, expiration=None):
+        return True
+
+    monkeypatch.setattr(redis, "get_redis_with_retry", get_redis_with_retry)
+    monkeypatch.setattr(redis, "set_redis_with_retry", set_redis_with_retry)
+    return TranslationMemory(max_entries=2, expiration=60)
+
+
+def test_key_depends_on_text_and_languages():
+    key = TranslationMemory.make_key("Hello", "auto", "hi")
+    assert key == TranslationMemory.make_key("Hello", "auto", "hi")
+    assert key != TranslationMemory.make_key("Hello", "auto", "bn")
+    assert key != TranslationMemory.make_key("Hello", "en", "hi")
+    assert key != TranslationMemory.make_key("Hello!", "auto", "hi")
+
+
+@pytest.mark.asyncio
+async def test_hits_misses_and_lru_eviction(memory):
+    assert await memory.get("Hello", "auto", "hi") is None
+
+    await memory.set("Hello", "auto", "hi", "Namaste")
+    await memory.set("Bye", "auto", "hi", "Alvida")
+    assert await memory.get("Hello", "auto", "hi") == "Namaste"
+
+    await memory.set("Thanks", "auto", "hi", "Dhanyavaad")
+    assert await memory.get("Bye", "auto", "hi") is None
+
+    stats = memory.stats()
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["local_entries"] == 2
@@ -0,0 +1,158 @@
+import fakeredis
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import metrics, redis
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.database.base import Base
+from app.models.faq import FAQ
+from app.models.translation_job import TranslationJob
+from app.services import faq_cache
+from app.services import suggest as suggest_service
+from app.services import translation_queue
+from app.services import translator as translator_service
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis,
+        "redis",
+        fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+    )
+    monkeypatch.setattr(
+        redis, "redis_bytes", fakeredis.FakeAsyncRedis(server=server)
+    )
+    monkeypatch.setattr(
+        redis, "local_cache", redis.LocalCache(max_entries=100, ttl=30)
+    )
+    monkeypatch.setattr(
+        redis,
+        "circuit_breaker",
+        CircuitBreaker(name="redis", failure_threshold=5, reset_timeout=5),
+    )
+    monkeypatch.setattr(
+        suggest_service, "_indexes", suggest_service._new_indexes()
+    )
+    return server
+
+
+@pytest_asyncio.fixture
+async def sessions(monkeypatch, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}"
+    )
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(translation_queue, "AsyncSessionLocal", sessions)
+    yield sessions
+    await engine.dispose()
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    calls = []
+
+    async def translate_text(faq, lang, src="auto"):
+        calls.append((faq.id, lang, src))
+        return f"[{lang}] {faq.question}", f"[{lang}] {faq.answer}"
+
+    monkeypatch.setattr(translator_service, "translate_text", translate_text)
+    return calls
+
+
+async def claim_job(sessions, question, lang):
+    async with sessions() as db:
+        faq = await FAQ.create_faq(
+            question=question,
+            answer="Answer",
+            language="en",
+            db=db,
+            translation_languages=[lang],
+        )
+        (job,) = await TranslationJob.claim(
+            db=db, batch_size=10, lease_seconds=60
+        )
+    return faq.id, job
+
+
+@pytest.mark.asyncio
+async def test_job_is_stored_in_the_caches(server, sessions, translator):
+    await faq_cache.store_faqs("hi", [], await faq_cache.get_generation("hi"))
+    faq_id, job = await claim_job(sessions, "Stored question", "hi")
+
+    await translation_queue._process_job(job)
+
+    # Translated from the FAQ's own language rather than a detected one.
+    assert translator == [(faq_id, "hi", "en")]
+    redis.local_cache.invalidate()
+    _, faqs = await faq_cache.get_faqs("hi")
+    assert faqs == [
+        {"id": faq_id, "question": "[hi] Stored question", "answer": "[hi] Answer"}  # noqa
+    ]
+    assert [
+        suggestion["id"]
+        for suggestion in suggest_service.suggest("hi", "[hi] stored", 10)
+    ] == [faq_id]
+
+
+@pytest.mark.asyncio
+async def test_faq_deleted_after_the_commit_is_not_cached(
+    server, sessions, translator, monkeypatch
+):
+    await faq_cache.store_faqs("hi", [], await faq_cache.get_generation("hi"))
+    faq_id, job = await claim_job(sessions, "Deleted question", "hi")
+    set_faq = faq_cache.set_faq
+
+    async def delete_then_set_faq(lang, faq):
+        # The FAQ is deleted, and its caches cleared, after the job has
+        # committed but before the job writes them.
+        async with sessions() as db:
+            await FAQ.delete_faq(faq_id=faq_id, db=db)
+        await faq_cache.delete_faq(faq_id)
+        await suggest_service.remove(faq_id)
+        return await set_faq(lang, faq)
+
+    monkeypatch.setattr(faq_cache, "set_faq", delete_then_set_faq)
+
+    await translation_queue._process_job(job)
+
+    assert (await faq_cache.get_faqs("hi"))[1] == []
+    redis.local_cache.invalidate()
+    assert (await faq_cache.get_faqs("hi"))[1] == []
+    assert (await faq_cache.get_faq(faq_id, ["hi"]))[0] == {}
+    assert suggest_service.suggest("hi", "[hi] deleted", 10) == []
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_counted_once_per_ttl(sessions, monkeypatch):
+    monkeypatch.setattr(translation_queue, "_queue_depth_counted_at", None)
+    counts = []
+    count_by_status = TranslationJob.count_by_status
+
+    async def counting_count_by_status(**kwargs):
+        counts.append(kwargs["statuses"])
+        return await count_by_status(**kwargs)
+
+    monkeypatch.setattr(
+        TranslationJob, "count_by_status", counting_count_by_status
+    )
+    await claim_job(sessions, "Counted question", "hi")
+
+    await translation_queue.record_queue_depth()
+    await translation_queue.record_queue_depth()
+
+    assert len(counts) == 1
+    gauge = metrics.TRANSLATION_QUEUE_JOBS.labels("running")
+    assert gauge._value.get() == 1
+
+    translation_queue._queue_depth_counted_at -= (
+        settings.TRANSLATION_QUEUE_DEPTH_TTL
+    )
+    await translation_queue.record_queue_depth()
+
+    assert len(counts) == 2
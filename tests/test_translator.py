@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+from googletrans import Translator
+from googletrans.models import Translated
+
+from app.core import constants, redis
+from app.core.rate_limit import TokenBucket
+from app.schemas.faq import FAQ as FAQSchema
+from app.services import translator as translator_service
+from app.services.translation_backends import (
+    FakeTranslationBackend,
+    GoogleTranslateBackend,
+)
+from app.services.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    async def get_redis_with_retry(key):
+        return None
+
+    async def set_redis_with_retry(key, value, expiration=None):
+        return True
+
+    monkeypatch.setattr(redis, "get_redis_with_retry", get_redis_with_retry)
+    monkeypatch.setattr(redis, "set_redis_with_retry", set_redis_with_retry)
+    monkeypatch.setattr(
+        translator_service,
+        "translation_memory",
+        TranslationMemory(max_entries=100, expiration=60),
+    )
+
+    backend = FakeTranslationBackend()
+    monkeypatch.setattr(
+        translator_service,
+        "batcher",
+        translator_service.TranslationBatcher(
+            backend=backend, max_batch_size=64, max_delay=0.01
+        ),
+    )
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_translations_for_all_languages_share_one_backend_call(backend):
+    faq = FAQSchema(id=1, question="Question", answer="Answer")
+
+    results = await asyncio.gather(
+        *(
+            translator_service.translate_text(faq=faq, lang=lang)
+            for lang in constants.SUPPORTED_LANGUAGES
+        )
+    )
+
+    assert backend.calls == 1
+    assert backend.items == 2 * len(constants.SUPPORTED_LANGUAGES)
+    assert results[1] == ("[hi] Question", "[hi] Answer")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_are_translated_once(backend):
+    faqs = [
+        FAQSchema(id=faq_id, question=f"Question {faq_id}", answer="Same")
+        for faq_id in range(3)
+    ]
+
+    await asyncio.gather(
+        *(
+            translator_service.translate_text(faq=faq, lang="hi")
+            for faq in faqs
+        )
+    )
+
+    assert backend.calls == 1
+    assert backend.items == 4
+
+
+@pytest.mark.asyncio
+async def test_memory_is_keyed_on_the_source_language(backend):
+    faq = FAQSchema(id=1, question="Gift", answer="Gift")
+
+    await translator_service.translate_text(faq=faq, lang="hi", src="en")
+    await translator_service.translate_text(faq=faq, lang="hi", src="de")
+    await translator_service.translate_text(faq=faq, lang="hi", src="en")
+
+    # The German "Gift" is not served the English translation.
+    assert backend.calls == 2
+    memory = translator_service.translation_memory
+    assert await memory.get("Gift", "en", "hi") == "[hi] Gift"
+    assert await memory.get("Gift", "auto", "hi") is None
+
+
+@pytest.mark.asyncio
+async def test_one_failing_language_does_not_fail_the_others(backend):
+    translate_batch = backend.translate_batch
+
+    async def fail_for_hindi(items, src):
+        if any(dest == "hi" for _, dest in items):
+            raise RuntimeError("quota exceeded")
+        return await translate_batch(items, src)
+
+    backend.translate_batch = fail_for_hindi
+    faq = FAQSchema(id=1, question="Question", answer="Answer")
+
+    results = await asyncio.gather(
+        translator_service.translate_text(faq=faq, lang="hi"),
+        translator_service.translate_text(faq=faq, lang="bn"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == ("[bn] Question", "[bn] Answer")
+
+
+@pytest.mark.asyncio
+async def test_google_backend_translates_one_text_per_request(monkeypatch):
+    requests = []
+
+    # googletrans 4.0.0-rc1 takes a single string per call.
+    def translate(self, text: str, dest="en", src="auto"):
+        assert isinstance(text, str)
+        requests.append((text, dest))
+        return Translated(
+            src=src,
+            dest=dest,
+            origin=text,
+            text=f"[{dest}] {text}",
+            pronunciation=None,
+            parts=[],
+        )
+
+    monkeypatch.setattr(Translator, "translate", translate)
+    backend = GoogleTranslateBackend()
+    items = [("Question", "hi"), ("Answer", "hi"), ("Question", "bn")]
+
+    translations = await backend.translate_batch(items, "en")
+
+    assert translations == ["[hi] Question", "[hi] Answer", "[bn] Question"]
+    assert sorted(requests) == sorted(items)
+    assert backend.requests_for(items) == len(requests)
+
+
+@pytest.mark.asyncio
+async def test_batches_larger_than_the_rate_limit_burst_are_split():
+    class PerItemBackend(FakeTranslationBackend):
+        def requests_for(self, items):
+            return len(items)
+
+    backend = PerItemBackend()
+    batcher = translator_service.TranslationBatcher(
+        backend=backend,
+        max_batch_size=64,
+        max_delay=0.01,
+        rate_limit=TokenBucket(rate=1000, burst=2),
+    )
+
+    results = await asyncio.gather(
+        *(batcher.translate(f"Text {i}", "en", "hi") for i in range(5))
+    )
+
+    assert results == [f"[hi] Text {i}" for i in range(5)]
+    assert backend.calls == 3
+    assert backend.items == 5